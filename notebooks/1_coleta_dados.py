@@ -13,23 +13,36 @@ Este notebook implementa o processo de coleta de dados educacionais de múltipla
 # Importar bibliotecas necessárias
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+import pyarrow.compute as pc
+import io
 import os
+import csv
+import pathlib
+import posixpath
+import shutil
 import zipfile
 import requests
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from tqdm.auto import tqdm
 import warnings
 warnings.filterwarnings('ignore')
 
-# Definir diretórios
-BASE_DIR = os.path.dirname(os.path.abspath('__file__'))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
-RAW_DIR = os.path.join(DATA_DIR, 'raw')
-PROCESSED_DIR = os.path.join(DATA_DIR, 'processed')
+# Definir diretórios (raiz do repositório quando executado como script;
+# diretório de trabalho quando executado no Jupyter, onde __file__ não existe)
+BASE_DIR = pathlib.Path(__file__).resolve().parent.parent if '__file__' in globals() else pathlib.Path.cwd()
+DATA_DIR = BASE_DIR / 'data'
+RAW_DIR = DATA_DIR / 'raw'
+PROCESSED_DIR = DATA_DIR / 'processed'
 
 # Criar diretórios se não existirem
-for directory in [DATA_DIR, RAW_DIR, PROCESSED_DIR]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+for directory in (DATA_DIR, RAW_DIR, PROCESSED_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
 
 # Função para registrar log
 def log_message(message, level="INFO"):
@@ -41,189 +54,334 @@ log_message("Ambiente configurado com sucesso")
 
 ## 3. Funções para Download de Dados
 
-### 3.1 Censo Escolar (INEP)
+# Sessão HTTP compartilhada: reaproveita conexões (keep-alive) entre downloads
+# e repete automaticamente requisições com falhas transitórias
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=5,
+        connect=5,
+        read=5,
+        backoff_factor=1.0,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD'])
+    )
+))
 
-def download_censo_escolar(ano, dest_dir=RAW_DIR):
+# Arquivos ZIP já presentes em RAW_DIR, listados uma única vez; o lock protege
+# as atualizações feitas pelos downloads executados em paralelo
+EXISTING = {f for f in os.listdir(RAW_DIR) if f.endswith('.zip')}
+EXISTING_LOCK = threading.Lock()
+
+def _arquivo_existe(filename, dest_dir):
+    """Verifica se o arquivo existe, usando a listagem inicial para RAW_DIR"""
+    if pathlib.Path(dest_dir) == RAW_DIR:
+        with EXISTING_LOCK:
+            return filename in EXISTING
+    return os.path.exists(os.path.join(dest_dir, filename))
+
+### 3.1 Fontes de dados
+
+# URL, nome do arquivo de destino e descrição de cada fonte
+SOURCES = {
+    'censo': {
+        'url': "https://download.inep.gov.br/microdados/microdados_censo_escolar_{ano}.zip",
+        'filename': "microdados_censo_escolar_{ano}.zip",
+        'descricao': "do Censo Escolar",
+    },
+    'saeb': {
+        'url': "https://download.inep.gov.br/microdados/microdados_saeb_{ano}.zip",
+        'filename': "microdados_saeb_{ano}.zip",
+        'descricao': "do SAEB",
+    },
+    'pnad': {
+        'url': "https://ftp.ibge.gov.br/Trabalho_e_Rendimento/Pesquisa_Nacional_por_Amostra_de_Domicilios_continua/Anual/Microdados/Visita/PNADC_{ano}_visita_5.zip",
+        'filename': "PNAD_Continua_Educacao_{ano}.zip",
+        'descricao': "da PNAD",
+    },
+    'indicadores': {
+        'url': "https://download.inep.gov.br/informacoes_estatisticas/indicadores_educacionais/indicadores_{ano}.zip",
+        'filename': "indicadores_educacionais_{ano}.zip",
+        'descricao': "dos indicadores educacionais",
+    },
+}
+
+def _cached_ok(url, filepath):
     """
-    Função para download dos microdados do Censo Escolar
+    Verifica se um arquivo já baixado está completo
+    
+    Compara o tamanho local com o Content-Length informado pelo servidor em uma
+    requisição HEAD, evitando confiar em arquivos truncados de execuções anteriores.
+    Quando o tamanho não pode ser confirmado, exige ao menos um ZIP íntegro.
     
     Args:
-        ano (int): Ano de referência do Censo Escolar
-        dest_dir (str): Diretório de destino para os arquivos
+        url (str): URL de origem do arquivo
+        filepath (str): Caminho do arquivo local (já existente)
     
     Returns:
-        str: Caminho para o arquivo baixado
+        bool: True se o arquivo local pode ser reutilizado
     """
-    # URL base para download dos microdados do Censo Escolar
-    base_url = f"https://download.inep.gov.br/microdados/microdados_censo_escolar_{ano}.zip"
-    
-    # Nome do arquivo de destino
-    filename = f"microdados_censo_escolar_{ano}.zip"
-    filepath = os.path.join(dest_dir, filename)
-    
-    # Verificar se o arquivo já existe
-    if os.path.exists(filepath):
-        log_message(f"Arquivo {filename} já existe. Pulando download.")
-        return filepath
-    
     try:
-        log_message(f"Iniciando download do Censo Escolar {ano}...")
-        # Realizar o download
-        response = requests.get(base_url, stream=True)
-        response.raise_for_status()
-        
-        # Salvar o arquivo
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        log_message(f"Download do Censo Escolar {ano} concluído com sucesso.")
-        return filepath
+        head = SESSION.head(url, allow_redirects=True, timeout=10)
+        head.raise_for_status()
+    except requests.RequestException as e:
+        # Sem acesso ao servidor: manter o arquivo local se for um ZIP íntegro
+        log_message(f"Não foi possível validar {filepath}: {str(e)}", "WARNING")
+        return zipfile.is_zipfile(filepath)
     
-    except Exception as e:
-        log_message(f"Erro ao baixar Censo Escolar {ano}: {str(e)}", "ERROR")
-        return None
-
-### 3.2 SAEB (INEP)
+    tamanho_remoto = head.headers.get('Content-Length')
+    if tamanho_remoto is None:
+        return zipfile.is_zipfile(filepath)
+    return os.path.getsize(filepath) == int(tamanho_remoto)
 
-def download_saeb(ano, dest_dir=RAW_DIR):
+def _validador(response):
     """
-    Função para download dos microdados do SAEB
+    Identificador da versão do arquivo remoto para requisições If-Range
     
     Args:
-        ano (int): Ano de referência do SAEB
-        dest_dir (str): Diretório de destino para os arquivos
+        response (requests.Response): Resposta do servidor
     
     Returns:
-        str: Caminho para o arquivo baixado
+        str: ETag forte ou Last-Modified, ou None se o servidor não informar nenhum
     """
-    # URL base para download dos microdados do SAEB
-    base_url = f"https://download.inep.gov.br/microdados/microdados_saeb_{ano}.zip"
-    
-    # Nome do arquivo de destino
-    filename = f"microdados_saeb_{ano}.zip"
-    filepath = os.path.join(dest_dir, filename)
-    
-    # Verificar se o arquivo já existe
-    if os.path.exists(filepath):
-        log_message(f"Arquivo {filename} já existe. Pulando download.")
-        return filepath
-    
-    try:
-        log_message(f"Iniciando download do SAEB {ano}...")
-        # Realizar o download
-        response = requests.get(base_url, stream=True)
-        response.raise_for_status()
-        
-        # Salvar o arquivo
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        log_message(f"Download do SAEB {ano} concluído com sucesso.")
-        return filepath
-    
-    except Exception as e:
-        log_message(f"Erro ao baixar SAEB {ano}: {str(e)}", "ERROR")
-        return None
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.headers.get('Last-Modified')
 
-### 3.3 PNAD Contínua (IBGE)
-
-def download_pnad(ano, dest_dir=RAW_DIR):
+def _download(fonte, ano, dest_dir=RAW_DIR):
     """
-    Função para download dos microdados da PNAD Contínua - Módulo Educação
+    Função genérica para download de uma das fontes definidas em SOURCES
     
     Args:
-        ano (int): Ano de referência da PNAD
+        fonte (str): Chave da fonte em SOURCES
+        ano (int): Ano de referência dos dados
         dest_dir (str): Diretório de destino para os arquivos
     
     Returns:
         str: Caminho para o arquivo baixado
     """
-    # URL base para download dos microdados da PNAD
-    base_url = f"https://ftp.ibge.gov.br/Trabalho_e_Rendimento/Pesquisa_Nacional_por_Amostra_de_Domicilios_continua/Anual/Microdados/Visita/PNADC_{ano}_visita_5.zip"
+    config = SOURCES[fonte]
+    base_url = config['url'].format(ano=ano)
+    descricao = config['descricao']
     
     # Nome do arquivo de destino
-    filename = f"PNAD_Continua_Educacao_{ano}.zip"
+    filename = config['filename'].format(ano=ano)
     filepath = os.path.join(dest_dir, filename)
+    # O download é gravado em um arquivo .part e só ocupa o caminho final quando completo;
+    # ao lado dele, o validador (ETag/Last-Modified) da versão remota de origem
+    parcial = filepath + '.part'
+    arquivo_validador = parcial + '.validador'
     
-    # Verificar se o arquivo já existe
-    if os.path.exists(filepath):
+    # Verificar se o arquivo já existe e está completo
+    existe = _arquivo_existe(filename, dest_dir)
+    if existe and _cached_ok(base_url, filepath):
         log_message(f"Arquivo {filename} já existe. Pulando download.")
         return filepath
     
+    if existe:
+        # Tamanho diferente do remoto (arquivo republicado ou truncado): sem como saber de
+        # qual versão vieram os bytes locais, então o arquivo é descartado
+        os.remove(filepath)
+        if pathlib.Path(dest_dir) == RAW_DIR:
+            with EXISTING_LOCK:
+                EXISTING.discard(filename)
+    
     try:
-        log_message(f"Iniciando download da PNAD {ano}...")
+        log_message(f"Iniciando download {descricao} {ano}...")
+        # Retomar um .part apenas com o validador da sua versão de origem: com If-Range o
+        # servidor envia só o restante (206) se o arquivo remoto não mudou, ou o arquivo
+        # completo (200) caso contrário
+        baixado = 0
+        headers = {}
+        if os.path.exists(parcial) and os.path.exists(arquivo_validador):
+            with open(arquivo_validador, encoding='utf-8') as f:
+                validador = f.read().strip()
+            baixado = os.path.getsize(parcial)
+            if baixado and validador:
+                headers = {'Range': f'bytes={baixado}-', 'If-Range': validador}
+        
         # Realizar o download
-        response = requests.get(base_url, stream=True)
+        response = SESSION.get(base_url, stream=True, timeout=(10, 120), headers=headers)
+        if response.status_code == 416:
+            # Arquivo local maior que o remoto: baixar novamente do início
+            response.close()
+            response = SESSION.get(base_url, stream=True, timeout=(10, 120))
         response.raise_for_status()
         
-        # Salvar o arquivo
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Servidor com suporte a Range responde 206 e envia apenas o restante
+        modo = 'ab' if response.status_code == 206 else 'wb'
+        if modo == 'ab':
+            log_message(f"Retomando download de {filename} a partir de {baixado} bytes")
+        else:
+            # Novo download do início: registrar a versão remota para retomadas futuras
+            validador = _validador(response)
+            if validador:
+                with open(arquivo_validador, 'w', encoding='utf-8') as f:
+                    f.write(validador)
+            elif os.path.exists(arquivo_validador):
+                os.remove(arquivo_validador)
+        
+        # Tamanho total esperado, para acompanhar o progresso e detectar travamentos
+        inicial = baixado if modo == 'ab' else 0
+        total = int(response.headers.get('Content-Length', 0)) + inicial
+        
+        # Salvar o arquivo em blocos de 1 MiB
+        response.raw.decode_content = True
+        with open(parcial, modo, buffering=1024 * 1024) as f, \
+                tqdm.wrapattr(f, 'write', total=total or None, initial=inicial, desc=filename,
+                              position=list(SOURCES).index(fonte)) as saida:
+            shutil.copyfileobj(response.raw, saida, length=1024 * 1024)
+            # Sincronizar com o disco uma única vez, ao final da transferência
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # Conferir o tamanho final antes de publicar (conexão encerrada antes do fim); com
+        # Content-Encoding o Content-Length se refere aos bytes comprimidos
+        if total and 'Content-Encoding' not in response.headers and os.path.getsize(parcial) != total:
+            raise requests.RequestException(
+                f"Download incompleto de {filename}: {os.path.getsize(parcial)} de {total} bytes"
+            )
         
-        log_message(f"Download da PNAD {ano} concluído com sucesso.")
+        # Transferência completa: publicar o arquivo no caminho final
+        os.replace(parcial, filepath)
+        if os.path.exists(arquivo_validador):
+            os.remove(arquivo_validador)
+        
+        if pathlib.Path(dest_dir) == RAW_DIR:
+            with EXISTING_LOCK:
+                EXISTING.add(filename)
+        
+        log_message(f"Download {descricao} {ano} concluído com sucesso.")
         return filepath
     
-    except Exception as e:
-        log_message(f"Erro ao baixar PNAD {ano}: {str(e)}", "ERROR")
+    except (requests.RequestException, OSError) as e:
+        # O arquivo .part é mantido fora do caminho final: a próxima execução
+        # não o confunde com um download completo e retoma a partir dele
+        log_message(f"Erro ao baixar dados {descricao} {ano}: {str(e)}", "ERROR")
         return None
 
-### 3.4 Indicadores Educacionais (INEP)
+### 3.2 Censo Escolar (INEP)
+
+def download_censo_escolar(ano, dest_dir=RAW_DIR):
+    """Download dos microdados do Censo Escolar"""
+    return _download('censo', ano, dest_dir)
+
+### 3.3 SAEB (INEP)
+
+def download_saeb(ano, dest_dir=RAW_DIR):
+    """Download dos microdados do SAEB"""
+    return _download('saeb', ano, dest_dir)
+
+### 3.4 PNAD Contínua (IBGE)
+
+def download_pnad(ano, dest_dir=RAW_DIR):
+    """Download dos microdados da PNAD Contínua - Módulo Educação"""
+    return _download('pnad', ano, dest_dir)
+
+### 3.5 Indicadores Educacionais (INEP)
 
 def download_indicadores(ano, dest_dir=RAW_DIR):
+    """Download dos indicadores educacionais do INEP"""
+    return _download('indicadores', ano, dest_dir)
+
+### 3.6 Leitura remota de arquivos ZIP
+
+class RangeHTTPFile(io.RawIOBase):
     """
-    Função para download dos indicadores educacionais do INEP
-    
-    Args:
-        ano (int): Ano de referência dos indicadores
-        dest_dir (str): Diretório de destino para os arquivos
+    Arquivo remoto somente leitura com acesso aleatório via requisições HTTP Range
     
-    Returns:
-        str: Caminho para o arquivo baixado
+    Permite que o zipfile leia o diretório central e apenas as entradas
+    necessárias de um ZIP remoto, sem baixar o arquivo completo para o disco.
     """
-    # URL base para download dos indicadores educacionais
-    base_url = f"https://download.inep.gov.br/informacoes_estatisticas/indicadores_educacionais/indicadores_{ano}.zip"
     
-    # Nome do arquivo de destino
-    filename = f"indicadores_educacionais_{ano}.zip"
-    filepath = os.path.join(dest_dir, filename)
+    def __init__(self, url, session=SESSION):
+        self.url = url
+        self.session = session
+        head = session.head(url, allow_redirects=True, timeout=10)
+        head.raise_for_status()
+        tamanho = head.headers.get('Content-Length')
+        if tamanho is None:
+            # Sem o tamanho total não há como localizar o diretório central do ZIP
+            raise requests.RequestException(f"Servidor não informou Content-Length para {url}", response=head)
+        self.size = int(tamanho)
+        self.pos = 0
     
-    # Verificar se o arquivo já existe
-    if os.path.exists(filepath):
-        log_message(f"Arquivo {filename} já existe. Pulando download.")
-        return filepath
+    def readable(self):
+        return True
     
-    try:
-        log_message(f"Iniciando download dos indicadores educacionais {ano}...")
-        # Realizar o download
-        response = requests.get(base_url, stream=True)
+    def seekable(self):
+        return True
+    
+    def tell(self):
+        return self.pos
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self.pos = offset
+        elif whence == io.SEEK_CUR:
+            self.pos += offset
+        elif whence == io.SEEK_END:
+            self.pos = self.size + offset
+        return self.pos
+    
+    def readinto(self, buffer):
+        if self.pos >= self.size:
+            return 0
+        fim = min(self.pos + len(buffer), self.size) - 1
+        response = self.session.get(self.url, headers={'Range': f'bytes={self.pos}-{fim}'}, timeout=(10, 120))
         response.raise_for_status()
-        
-        # Salvar o arquivo
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        log_message(f"Download dos indicadores educacionais {ano} concluído com sucesso.")
-        return filepath
+        if response.status_code != 206:
+            raise OSError(f"Servidor não suporta requisições Range para {self.url}")
+        dados = response.content
+        buffer[:len(dados)] = dados
+        self.pos += len(dados)
+        return len(dados)
+
+def abrir_zip_remoto(fonte, ano):
+    """
+    Abre um arquivo ZIP remoto de uma das fontes para leitura sob demanda
     
-    except Exception as e:
-        log_message(f"Erro ao baixar indicadores educacionais {ano}: {str(e)}", "ERROR")
-        return None
+    Args:
+        fonte (str): Chave da fonte em SOURCES
+        ano (int): Ano de referência dos dados
+    
+    Returns:
+        io.BufferedReader: Arquivo remoto pronto para uso com zipfile.ZipFile
+    """
+    url = SOURCES[fonte]['url'].format(ano=ano)
+    return io.BufferedReader(RangeHTTPFile(url), buffer_size=1024 * 1024)
 
 ## 4. Extração e Pré-processamento Inicial
 
 ### 4.1 Extração do Censo Escolar
 
+# Tipos compactos para as colunas de matrícula (códigos cabem em inteiros pequenos)
+DTYPES = {
+    'NU_ANO_CENSO': 'int16',
+    'CO_UF': 'int8',
+    'CO_MUNICIPIO': 'int32',
+    'CO_ENTIDADE': 'int32',
+    'TP_DEPENDENCIA': 'int8',
+    'TP_LOCALIZACAO': 'int8',
+    'TP_SEXO': 'int8',
+    'TP_COR_RACA': 'int8',
+    'NU_IDADE': 'int8',
+    'TP_ETAPA_ENSINO': 'int16',
+    'IN_TRANSPORTE_PUBLICO': 'int8',
+    'TP_SITUACAO': 'int8'
+}
+
 def extrair_censo_escolar(ano, arquivo_zip):
     """
     Função para extrair e processar dados do Censo Escolar
     
     Args:
         ano (int): Ano do Censo Escolar
-        arquivo_zip (str): Caminho para o arquivo ZIP dos microdados
+        arquivo_zip (str ou file-like): Caminho para o arquivo ZIP dos microdados
+            ou arquivo remoto aberto com abrir_zip_remoto
     
     Returns:
         pandas.DataFrame: DataFrame com dados do ensino médio extraídos e processados
@@ -231,86 +389,97 @@ def extrair_censo_escolar(ano, arquivo_zip):
     log_message(f"Iniciando extração de dados do Censo Escolar {ano}...")
     
     # Verificar se arquivo existe
-    if not os.path.exists(arquivo_zip):
+    if isinstance(arquivo_zip, str) and not os.path.exists(arquivo_zip):
         log_message(f"Arquivo {arquivo_zip} não encontrado", "ERROR")
         return None
     
-    # Extrair arquivos para diretório temporário
-    temp_dir = os.path.join(RAW_DIR, f"temp_censo_{ano}")
-    os.makedirs(temp_dir, exist_ok=True)
-    
     try:
         with zipfile.ZipFile(arquivo_zip, 'r') as zip_ref:
-            # Extrair apenas arquivos relevantes (matricula e escola)
-            for file in zip_ref.namelist():
-                if ('MATRICULA' in file.upper() or 'ESCOLA' in file.upper()) and file.endswith('.CSV'):
-                    zip_ref.extract(file, temp_dir)
-        
-        log_message("Arquivos do Censo Escolar extraídos com sucesso")
-        
-        # Encontrar o arquivo de matrícula
-        matricula_file = None
-        for root, _, files in os.walk(temp_dir):
-            for file in files:
-                if 'MATRICULA' in file.upper() and file.endswith('.CSV'):
-                    matricula_file = os.path.join(root, file)
-                    break
-        
-        if not matricula_file:
-            log_message("Arquivo de matrícula não encontrado", "ERROR")
-            return None
-        
-        # Ler amostra para identificar o separador
-        with open(matricula_file, 'r', encoding='latin-1') as f:
-            primeira_linha = f.readline()
-            if '|' in primeira_linha:
-                separador = '|'
-            elif ';' in primeira_linha:
-                separador = ';'
-            else:
+            # Localizar o arquivo de matrícula diretamente no índice do ZIP, comparando apenas
+            # o nome do arquivo (mesma regra de scripts/coleta/censo_escolar.py)
+            nomes = [(n, posixpath.basename(n).upper()) for n in zip_ref.namelist()]
+            matricula_entry = next(
+                (n for n, base in nomes if 'MATRICULA' in base and base.endswith('.CSV')), None
+            )
+            
+            if not matricula_entry:
+                log_message("Arquivo de matrícula não encontrado", "ERROR")
+                return None
+            
+            # Ler amostra de 4 KiB para identificar o separador
+            with zip_ref.open(matricula_entry) as fh:
+                amostra = fh.read(4096).decode('latin-1')
+            # Descartar a última linha, possivelmente truncada pela leitura parcial
+            if '\n' in amostra:
+                amostra = amostra[:amostra.rindex('\n')]
+            try:
+                separador = csv.Sniffer().sniff(amostra, delimiters='|;,').delimiter
+            except csv.Error:
                 separador = ','
-        
-        # Definir colunas relevantes para análise de abandono no ensino médio
-        colunas_relevantes = [
-            'NU_ANO_CENSO', 'CO_UF', 'CO_MUNICIPIO', 'CO_ENTIDADE', 
-            'TP_DEPENDENCIA', 'TP_LOCALIZACAO', 'TP_SEXO', 'TP_COR_RACA',
-            'NU_IDADE', 'TP_ETAPA_ENSINO', 'IN_TRANSPORTE_PUBLICO',
-            'TP_SITUACAO'  # Situação do aluno ao final do ano letivo
-        ]
-        
-        # Ler apenas as primeiras linhas para verificar colunas existentes
-        df_teste = pd.read_csv(matricula_file, sep=separador, encoding='latin-1', nrows=5)
-        colunas_existentes = [col for col in colunas_relevantes if col in df_teste.columns]
-        
-        # Ler os dados de matrícula (apenas ensino médio)
-        log_message("Carregando dados de matrícula do ensino médio...")
-        
-        # Lendo amostra pequena para demonstração
-        df_matricula = pd.read_csv(
-            matricula_file,
-            sep=separador,
-            encoding='latin-1',
-            usecols=colunas_existentes,
-            nrows=10000  # Limitando para amostra
-        )
-        
-        # Filtrar apenas ensino médio (códigos variam por ano)
-        codigos_ensino_medio = list(range(25, 38))  # Códigos típicos do ensino médio
-        df_ensino_medio = df_matricula[df_matricula['TP_ETAPA_ENSINO'].isin(codigos_ensino_medio)]
+            
+            # Definir colunas relevantes para análise de abandono no ensino médio
+            colunas_relevantes = [
+                'NU_ANO_CENSO', 'CO_UF', 'CO_MUNICIPIO', 'CO_ENTIDADE', 
+                'TP_DEPENDENCIA', 'TP_LOCALIZACAO', 'TP_SEXO', 'TP_COR_RACA',
+                'NU_IDADE', 'TP_ETAPA_ENSINO', 'IN_TRANSPORTE_PUBLICO',
+                'TP_SITUACAO'  # Situação do aluno ao final do ano letivo
+            ]
+            
+            # Ler apenas as primeiras linhas para verificar colunas existentes
+            with zip_ref.open(matricula_entry) as fh:
+                df_teste = pd.read_csv(fh, sep=separador, encoding='latin-1', nrows=5)
+            colunas_existentes = [col for col in colunas_relevantes if col in df_teste.columns]
+            
+            # Ler os dados de matrícula (apenas ensino médio)
+            log_message("Carregando dados de matrícula do ensino médio...")
+            
+            # Lendo amostra pequena para demonstração, direto do ZIP (sem extração em disco)
+            # com o leitor CSV do PyArrow (multithread, projeção de colunas no parser)
+            nrows = 10000  # Limitando para amostra
+            with zip_ref.open(matricula_entry) as fh:
+                leitor = pacsv.open_csv(
+                    fh,
+                    read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20, encoding='latin-1'),
+                    parse_options=pacsv.ParseOptions(delimiter=separador),
+                    convert_options=pacsv.ConvertOptions(
+                        include_columns=colunas_existentes,
+                        column_types={
+                            col: pa.from_numpy_dtype(np.dtype(tipo))
+                            for col, tipo in DTYPES.items() if col in colunas_existentes
+                        }
+                    )
+                )
+                # Filtrar apenas ensino médio (códigos variam por ano) a cada lote lido,
+                # mantendo em memória somente as linhas retidas
+                # Códigos típicos do ensino médio formam o intervalo contíguo 25-37
+                lotes = []
+                total_linhas = 0
+                for lote in leitor:
+                    lote = lote.slice(0, nrows - total_linhas)
+                    total_linhas += lote.num_rows
+                    etapa = lote.column('TP_ETAPA_ENSINO')
+                    lotes.append(lote.filter(pc.and_(pc.greater_equal(etapa, 25), pc.less_equal(etapa, 37))))
+                    if total_linhas >= nrows:
+                        break
+                tabela = pa.Table.from_batches(lotes, schema=leitor.schema)
+            df_ensino_medio = tabela.to_pandas()
         
         log_message(f"Processados {len(df_ensino_medio)} registros de matrícula do ensino médio")
         
-        # Salvar amostra processada
-        output_file = os.path.join(PROCESSED_DIR, f"amostra_censo_escolar_{ano}_ensino_medio.csv")
-        df_ensino_medio.to_csv(output_file, index=False)
+        # Salvar amostra processada como dataset Parquet particionado por UF,
+        # permitindo que as etapas seguintes leiam apenas os estados de interesse
+        output_file = os.path.join(PROCESSED_DIR, f"amostra_censo_escolar_{ano}_ensino_medio.parquet")
+        df_ensino_medio.to_parquet(
+            output_file,
+            engine='pyarrow',
+            compression='snappy',
+            partition_cols=['CO_UF'],
+            existing_data_behavior='delete_matching',
+            index=False
+        )
         
         log_message(f"Amostra salva em {output_file}")
         
-        # Limpeza: remover diretório temporário
-        for file in os.listdir(temp_dir):
-            os.remove(os.path.join(temp_dir, file))
-        os.rmdir(temp_dir)
-        
         return df_ensino_medio
     
     except Exception as e:
@@ -324,23 +493,46 @@ def extrair_censo_escolar(ano, arquivo_zip):
 # Definir ano de referência
 ano_referencia = 2022
 
+# Ler o Censo Escolar diretamente do servidor, sem salvar o ZIP em disco
+LER_CENSO_REMOTO = False
+
+# Downloads independentes executados em paralelo (operações limitadas por rede)
+downloads = [
+    (download_pnad, 'pnad'),
+    (download_indicadores, 'indicadores'),
+]
+if not LER_CENSO_REMOTO:
+    downloads.append((download_censo_escolar, 'censo'))
+if (ano_referencia % 2) == 1:  # SAEB ocorre em anos ímpares
+    downloads.append((download_saeb, 'saeb'))
+
+arquivos = {}
+with ThreadPoolExecutor(max_workers=4) as executor:
+    futures = {executor.submit(fn, ano_referencia): nome for fn, nome in downloads}
+    for future in as_completed(futures):
+        arquivos[futures[future]] = future.result()
+
+arquivo_censo = arquivos.get('censo')
+if LER_CENSO_REMOTO:
+    try:
+        arquivo_censo = abrir_zip_remoto('censo', ano_referencia)
+    except requests.RequestException as e:
+        # Sem leitura remota: baixar o arquivo completo
+        log_message(f"Erro ao abrir Censo Escolar {ano_referencia} remotamente: {str(e)}", "ERROR")
+        arquivo_censo = download_censo_escolar(ano_referencia)
+arquivo_saeb = arquivos.get('saeb')
+arquivo_pnad = arquivos.get('pnad')
+arquivo_indicadores = arquivos.get('indicadores')
+
 # Pipeline para Censo Escolar
-arquivo_censo = download_censo_escolar(ano_referencia)
 if arquivo_censo:
     df_censo = extrair_censo_escolar(ano_referencia, arquivo_censo)
     print(f"Shape dos dados do Censo Escolar: {df_censo.shape if df_censo is not None else 'N/A'}")
 
-# Pipeline para SAEB (anos ímpares)
-if (ano_referencia % 2) == 1:  # SAEB ocorre em anos ímpares
-    arquivo_saeb = download_saeb(ano_referencia)
-    # Processamento do SAEB...
+# Processamento do SAEB...
 
-# Pipeline para PNAD
-arquivo_pnad = download_pnad(ano_referencia)
 # Processamento da PNAD...
 
-# Pipeline para Indicadores Educacionais
-arquivo_indicadores = download_indicadores(ano_referencia)
 # Processamento dos indicadores...
 
 ## 6. Resumo e Próximos Passos
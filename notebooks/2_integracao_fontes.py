@@ -9,20 +9,45 @@ Este notebook realiza a análise exploratória dos dados integrados sobre abando
 # Importar bibliotecas necessárias
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import seaborn as sns
 from scipy import stats
-import statsmodels.api as sm
+import pyarrow.parquet as pq
+import gc
 import os
+import multiprocessing as mp
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Numba é opcional: acelera as agregações por grupo na base completa de escolas
+try:
+    from numba import njit
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
+
 # Configurações de visualização
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 12
+matplotlib.style.use('seaborn-v0_8-whitegrid')
+matplotlib.rcParams['figure.figsize'] = (12, 8)
+matplotlib.rcParams['font.size'] = 12
 cores = ["#1e88e5", "#ff0d57", "#13b755", "#7c52ff", "#ffc000"]
+# SMOKE_TEST=1 encolhe o caminho de demonstração (menos linhas simuladas, PNGs em 96 dpi
+# e sem pairplot) para iterações rápidas de desenvolvimento e execuções de CI
+SMOKE_TEST = os.environ.get('SMOKE_TEST', '0') == '1'
+
+DPI_GRAFICOS = 96 if SMOKE_TEST else 150  # 150 basta para tela; usar 300 apenas para publicação
+
+# Execução em escala INEP: USE_DASK=1 processa a base de escolas fora da memória com Dask
+USE_DASK = os.environ.get('USE_DASK', '0') == '1'
+if USE_DASK:
+    import dask.dataframe as dd
 
 # Definir diretórios
 BASE_DIR = os.path.dirname(os.path.abspath('__file__'))
@@ -33,8 +58,7 @@ PLOTS_DIR = os.path.join(BASE_DIR, 'visualizacoes/graficos')
 
 # Criar diretórios se não existirem
 for directory in [DATA_DIR, PROCESSED_DIR, RESULTS_DIR, PLOTS_DIR]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    pathlib.Path(directory).mkdir(parents=True, exist_ok=True)
 
 # Função para registrar log
 def log_message(message, level="INFO"):
@@ -42,65 +66,392 @@ def log_message(message, level="INFO"):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {level}: {message}")
 
+def salvar_figura(fig, nome_arquivo, dpi=DPI_GRAFICOS):
+    """
+    Renderiza uma figura com o backend Agg e salva no diretório de gráficos
+    
+    Args:
+        fig: Figura matplotlib criada via Figure (fora do estado global do pyplot)
+        nome_arquivo: Nome do arquivo PNG de saída
+        dpi: Resolução da imagem
+    """
+    FigureCanvasAgg(fig)
+    fig.savefig(os.path.join(PLOTS_DIR, nome_arquivo), bbox_inches='tight', dpi=dpi)
+
+def categorizar(valores, limites, rotulos, incluir_menor=False):
+    """
+    Classifica valores em faixas (a, b] via busca binária, como pd.cut, sem IntervalIndex
+    
+    Args:
+        valores: Array ou Series numérica a ser classificada
+        limites: Limites crescentes das faixas (len(rotulos) + 1 valores)
+        rotulos: Rótulos das faixas
+        incluir_menor: Se True, o limite inferior pertence à primeira faixa (como pd.qcut)
+        
+    Returns:
+        pd.Categorical ordenado com códigos int8; valores fora das faixas viram NaN
+    """
+    valores = np.asarray(valores)
+    codigos = np.searchsorted(limites, valores, side='left') - 1
+    if incluir_menor:
+        codigos[valores == limites[0]] = 0
+    codigos[(codigos < 0) | (codigos >= len(rotulos))] = -1
+    return pd.Categorical.from_codes(codigos.astype(np.int8), categories=rotulos, ordered=True)
+
 log_message("Ambiente configurado com sucesso")
 
+## 2.1 Funções de Renderização de Gráficos
+
+# Cada função recebe apenas dados já agregados e grava um PNG, sem depender de estado
+# global; assim os gráficos podem ser renderizados em paralelo em processos separados.
+
+def grafico_histograma(valores, media, mediana, nome_arquivo):
+    """
+    Histograma da taxa de abandono com curva KDE e marcadores de média e mediana
+    
+    Args:
+        valores: Array com as taxas de abandono
+        media: Taxa média de abandono
+        mediana: Taxa mediana de abandono
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    _, limites, _ = ax.hist(valores, bins=30, color=cores[0], alpha=0.7, edgecolor='white')
+    
+    # Curva KDE calculada uma única vez em grade fixa de 256 pontos, escalada para contagens
+    grade = np.linspace(limites[0], limites[-1], 256)
+    largura_bin = limites[1] - limites[0]
+    ax.plot(grade, stats.gaussian_kde(valores)(grade) * valores.size * largura_bin, color=cores[0])
+    
+    ax.axvline(media, color='red', linestyle='--', label=f'Média: {media:.2f}%')
+    ax.axvline(mediana, color='green', linestyle='--', label=f'Mediana: {mediana:.2f}%')
+    ax.set_title('Distribuição da Taxa de Abandono nos Municípios', fontsize=16)
+    ax.set_xlabel('Taxa de Abandono (%)', fontsize=14)
+    ax.set_ylabel('Frequência', fontsize=14)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_barras(rotulos, valores, cores_barras, titulo, xlabel, ylabel, nome_arquivo, figsize=(12, 8)):
+    """
+    Gráfico de barras verticais com o valor percentual anotado sobre cada barra
+    
+    Args:
+        rotulos: Rótulos das barras (eixo x)
+        valores: Altura das barras
+        cores_barras: Cor ou lista de cores das barras
+        titulo: Título do gráfico
+        xlabel: Rótulo do eixo x
+        ylabel: Rótulo do eixo y
+        nome_arquivo: Nome do arquivo PNG de saída
+        figsize: Tamanho da figura
+    """
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.bar(rotulos, valores, color=cores_barras)
+    
+    ax.set_title(titulo, fontsize=16)
+    ax.set_xlabel(xlabel, fontsize=14)
+    ax.set_ylabel(ylabel, fontsize=14)
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Adicionar valores nas barras
+    for i, v in enumerate(valores):
+        ax.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_mapa_correlacao(corr_matrix, nome_arquivo):
+    """
+    Mapa de calor do triângulo inferior da matriz de correlação
+    
+    Args:
+        corr_matrix: DataFrame com a matriz de correlação
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    fig = Figure(figsize=(12, 10))
+    ax = fig.subplots()
+    mask = np.triu(np.ones_like(corr_matrix))
+    cmap = sns.diverging_palette(230, 20, as_cmap=True)
+    
+    sns.heatmap(corr_matrix, mask=mask, cmap=cmap, vmax=1, vmin=-1, center=0,
+                annot=True, fmt='.2f', square=True, linewidths=.5, ax=ax)
+    
+    ax.set_title('Correlação entre Variáveis', fontsize=16)
+    fig.tight_layout()
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_correlacoes_abandono(correlacoes_abandono, nome_arquivo):
+    """
+    Barras horizontais com a correlação de cada variável com a taxa de abandono
+    
+    Args:
+        correlacoes_abandono: Series de correlações indexada pelo nome da variável
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    ax.barh(
+        correlacoes_abandono.index, 
+        correlacoes_abandono.values,
+        color=[cores[1] if x > 0 else cores[0] for x in correlacoes_abandono.values]
+    )
+    
+    ax.set_title('Correlação com Taxa de Abandono', fontsize=16)
+    ax.set_xlabel('Coeficiente de Correlação', fontsize=14)
+    ax.grid(True, alpha=0.3, axis='x')
+    ax.axvline(x=0, color='k', linestyle='-', alpha=0.3)
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_dispersoes(x_vars, y_var, variaveis, correlacoes, nome_arquivo):
+    """
+    Painel de dispersões das variáveis contra a taxa de abandono, com eixo y compartilhado
+    
+    Args:
+        x_vars: Matriz (n_amostras x n_variáveis) com os valores das variáveis explicativas
+        y_var: Array com as taxas de abandono
+        variaveis: Nomes das variáveis explicativas, na ordem das colunas de x_vars
+        correlacoes: Correlação de cada variável com a taxa de abandono (já calculada)
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    n_vars = len(variaveis)
+    fig = Figure(figsize=(8 * n_vars, 7))
+    axes = np.atleast_1d(fig.subplots(1, n_vars, sharey=True))
+    
+    for j, (ax, var, corr_valor) in enumerate(zip(axes, variaveis, correlacoes)):
+        x_var = x_vars[:, j]
+        ax.scatter(x_var, y_var, alpha=0.5, color=cores[0])
+        
+        # Reta de regressão por mínimos quadrados
+        inclinacao, intercepto = np.polyfit(x_var, y_var, 1)
+        x_reta = np.array([x_var.min(), x_var.max()])
+        ax.plot(x_reta, inclinacao * x_reta + intercepto, color=cores[2])
+        
+        ax.set_title(f'{var} x Taxa de Abandono', fontsize=16)
+        ax.set_xlabel(var, fontsize=14)
+        ax.grid(True, alpha=0.3)
+        
+        # Mostrar correlação
+        ax.annotate(f'Correlação: {corr_valor:.4f}', 
+                   xy=(0.05, 0.95), xycoords='axes fraction',
+                   bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
+    
+    axes[0].set_ylabel('Taxa de Abandono (%)', fontsize=14)
+    fig.tight_layout()
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_multivariado(dados, nome_arquivo):
+    """
+    Dispersão de pobreza x abandono colorida pelo IDEB e dimensionada pelo número de alunos
+    
+    Args:
+        dados: DataFrame com TAXA_POBREZA, TAXA_ABANDONO, IDEB e TOTAL_ALUNOS
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    
+    sns.scatterplot(
+        x='TAXA_POBREZA', 
+        y='TAXA_ABANDONO',
+        hue='IDEB',
+        size='TOTAL_ALUNOS',
+        sizes=(20, 200),
+        palette='viridis',
+        data=dados,
+        alpha=0.7,
+        ax=ax
+    )
+    
+    ax.set_title('Relação entre Pobreza, IDEB e Abandono Escolar', fontsize=16)
+    ax.set_xlabel('Taxa de Pobreza (%)', fontsize=14)
+    ax.set_ylabel('Taxa de Abandono (%)', fontsize=14)
+    ax.grid(True, alpha=0.3)
+    
+    salvar_figura(fig, nome_arquivo)
+
+def grafico_pairplot(amostra, nome_arquivo):
+    """
+    Pairplot (triângulo inferior) das variáveis-chave
+    
+    Args:
+        amostra: DataFrame amostrado contendo apenas as variáveis do pairplot
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    pairplot = sns.pairplot(
+        amostra,
+        diag_kind='kde',
+        plot_kws={'alpha': 0.6, 's': 30, 'edgecolor': 'k', 'linewidth': 0.5},
+        corner=True
+    )
+    
+    pairplot.fig.suptitle('Relações entre Variáveis-Chave', y=1.02, fontsize=16)
+    
+    # O pairplot cria a própria figura via pyplot; fechar explicitamente
+    salvar_figura(pairplot.fig, nome_arquivo)
+    plt.close(pairplot.fig)
+
+def grafico_coeficientes(coefs, nome_arquivo):
+    """
+    Barras com os coeficientes da regressão, marcando os significativos com '*'
+    
+    Args:
+        coefs: DataFrame com as colunas Variável, Coeficiente, Significativo e Cor
+        nome_arquivo: Nome do arquivo PNG de saída
+    """
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    ax.bar(coefs['Variável'], coefs['Coeficiente'], color=coefs['Cor'])
+    
+    ax.set_title('Coeficientes de Regressão para Taxa de Abandono', fontsize=16)
+    ax.set_xlabel('Variável', fontsize=14)
+    ax.set_ylabel('Coeficiente', fontsize=14)
+    ax.grid(True, alpha=0.3, axis='y')
+    ax.axhline(y=0, color='k', linestyle='-', alpha=0.3)
+    
+    # Adicionar marcador para significância estatística
+    for i, row in enumerate(coefs.itertuples()):
+        if row.Significativo:
+            ax.text(i, row.Coeficiente + (0.3 if row.Coeficiente > 0 else -0.3), 
+                   '*', ha='center', fontsize=20)
+    
+    salvar_figura(fig, nome_arquivo)
+
+def _renderizar_grafico(tarefa):
+    """Executa uma tarefa (função, argumentos) de renderização e retorna o arquivo gerado"""
+    funcao, kwargs = tarefa
+    funcao(**kwargs)
+    return kwargs['nome_arquivo']
+
+# Tarefas de renderização acumuladas nas seções 4 a 7 e executadas em paralelo ao final
+tarefas_graficos = []
+
 ## 3. Carregamento dos Dados Integrados
 
 # Definir ano de referência
 ano_referencia = 2022
 
+# Colunas efetivamente usadas na análise e tipos compactos para códigos e categorias
+COLUNAS_MUNICIPIOS = [
+    'CO_MUNICIPIO', 'CO_UF', 'TAXA_ABANDONO', 'TOTAL_ALUNOS', 'TOTAL_ESCOLAS',
+    'PIB_PER_CAPITA', 'TAXA_DESEMPREGO', 'IDEB', 'TAXA_POBREZA', 'INDICE_GINI',
+    'CATEGORIA_ABANDONO', 'NIVEL_POBREZA'
+]
+DTYPES_MUNICIPIOS = {
+    'CO_MUNICIPIO': 'int32',
+    'CO_UF': 'int8',
+    'CATEGORIA_ABANDONO': 'category',
+    'NIVEL_POBREZA': 'category'
+}
+
+COLUNAS_ESCOLAS = [
+    'CO_ENTIDADE', 'CO_MUNICIPIO', 'CO_UF', 'DEPENDENCIA', 'LOCALIZACAO',
+    'TAXA_ABANDONO', 'TOTAL_ALUNOS'
+]
+DTYPES_ESCOLAS = {
+    'CO_ENTIDADE': 'int32',
+    'CO_MUNICIPIO': 'int32',
+    'CO_UF': 'int8',
+    'DEPENDENCIA': 'category',
+    'LOCALIZACAO': 'category'
+}
+
+def carregar_dados(arquivo, colunas, dtypes, usar_dask=False):
+    """
+    Carrega dados processados lendo apenas as colunas usadas na análise
+    
+    Usa a versão Parquet do arquivo quando disponível (tipos preservados e projeção
+    de colunas sem custo) e recorre ao CSV, lido com o parser multithread do PyArrow.
+    
+    Args:
+        arquivo (str): Caminho do arquivo (a extensão é ignorada)
+        colunas (list): Colunas de interesse (as ausentes no arquivo são ignoradas)
+        dtypes (dict): Tipos a aplicar às colunas presentes no CSV
+        usar_dask (bool): Se True, retorna um Dask DataFrame preguiçoso lido do Parquet
+    
+    Returns:
+        pandas.DataFrame ou dask.dataframe.DataFrame: Dados carregados, ou None se
+        nenhum arquivo for encontrado
+    """
+    arquivo_parquet = pathlib.Path(arquivo).with_suffix('.parquet')
+    arquivo_csv = arquivo_parquet.with_suffix('.csv')
+    
+    if arquivo_parquet.exists():
+        colunas_existentes = [col for col in colunas if col in pq.read_schema(arquivo_parquet).names]
+        if usar_dask:
+            return dd.read_parquet(arquivo_parquet, columns=colunas_existentes).repartition(partition_size='100MB')
+        return pd.read_parquet(arquivo_parquet, columns=colunas_existentes)
+    
+    if arquivo_csv.exists():
+        colunas_existentes = [col for col in colunas if col in pd.read_csv(arquivo_csv, nrows=0).columns]
+        return pd.read_csv(
+            arquivo_csv,
+            engine='pyarrow',
+            usecols=colunas_existentes,
+            dtype={col: tipo for col, tipo in dtypes.items() if col in colunas_existentes}
+        )
+    
+    return None
+
 # Carregar dados por município
-arquivo_municipios = os.path.join(PROCESSED_DIR, f"dados_integrados_municipios_{ano_referencia}.csv")
-if os.path.exists(arquivo_municipios):
-    df_municipios = pd.read_csv(arquivo_municipios)
+arquivo_municipios = os.path.join(PROCESSED_DIR, f"dados_integrados_municipios_{ano_referencia}.parquet")
+df_municipios = carregar_dados(arquivo_municipios, COLUNAS_MUNICIPIOS, DTYPES_MUNICIPIOS)
+if df_municipios is not None:
     log_message(f"Dados de {len(df_municipios)} municípios carregados com sucesso")
 else:
     log_message(f"Arquivo {arquivo_municipios} não encontrado.", "WARNING")
-    # Criar dados simulados para demonstração
-    df_municipios = None
 
-# Carregar dados por escola
-arquivo_escolas = os.path.join(PROCESSED_DIR, f"dados_integrados_escolas_{ano_referencia}.csv")
-if os.path.exists(arquivo_escolas):
-    df_escolas = pd.read_csv(arquivo_escolas)
+# Carregar dados por escola (base grande: com USE_DASK, mantida preguiçosa em partições;
+# a base municipal tem no máximo ~5,6 mil linhas e permanece em pandas)
+arquivo_escolas = os.path.join(PROCESSED_DIR, f"dados_integrados_escolas_{ano_referencia}.parquet")
+df_escolas = carregar_dados(arquivo_escolas, COLUNAS_ESCOLAS, DTYPES_ESCOLAS, usar_dask=USE_DASK)
+escolas_em_dask = USE_DASK and isinstance(df_escolas, dd.DataFrame)
+if escolas_em_dask:
+    log_message(f"Dados de escolas mapeados em {df_escolas.npartitions} partições Dask")
+elif df_escolas is not None:
     log_message(f"Dados de {len(df_escolas)} escolas carregados com sucesso")
 else:
     log_message(f"Arquivo {arquivo_escolas} não encontrado.", "WARNING")
-    # Criar dados simulados para demonstração
-    df_escolas = None
 
 # Se os dados não foram encontrados, criar dados simulados para demonstração
 if df_municipios is None and df_escolas is None:
     log_message("Criando dados simulados para demonstração", "WARNING")
     
-    # Simulação de dados municipais
-    np.random.seed(42)
-    n_municipios = 500
+    # Simulação de dados municipais (um único gerador para toda a simulação)
+    rng = np.random.default_rng(42)
+    n_municipios = 100 if SMOKE_TEST else 500
     
     df_municipios = pd.DataFrame({
-        'CO_MUNICIPIO': np.random.randint(1000000, 9999999, n_municipios),
-        'CO_UF': np.random.choice(range(11, 53), n_municipios),
-        'TAXA_ABANDONO': np.random.beta(2, 15, n_municipios) * 100,
-        'TOTAL_ALUNOS': np.random.randint(200, 10000, n_municipios),
-        'TOTAL_ESCOLAS': np.random.randint(1, 50, n_municipios),
-        'PIB_PER_CAPITA': np.random.lognormal(10, 1, n_municipios),
-        'TAXA_DESEMPREGO': np.random.beta(2, 10, n_municipios) * 100,
-        'IDEB': np.random.normal(4.5, 1.2, n_municipios).clip(0, 10),
-        'TAXA_POBREZA': np.random.beta(2, 7, n_municipios) * 100,
-        'INDICE_GINI': np.random.beta(5, 15, n_municipios),
+        'CO_MUNICIPIO': rng.integers(1000000, 9999999, n_municipios),
+        'CO_UF': rng.choice(range(11, 53), n_municipios),
+        'TAXA_ABANDONO': rng.beta(2, 15, n_municipios) * 100,
+        'TOTAL_ALUNOS': rng.integers(200, 10000, n_municipios),
+        'TOTAL_ESCOLAS': rng.integers(1, 50, n_municipios),
+        'PIB_PER_CAPITA': rng.lognormal(10, 1, n_municipios),
+        'TAXA_DESEMPREGO': rng.beta(2, 10, n_municipios) * 100,
+        'IDEB': rng.normal(4.5, 1.2, n_municipios).clip(0, 10),
+        'TAXA_POBREZA': rng.beta(2, 7, n_municipios) * 100,
+        'INDICE_GINI': rng.beta(5, 15, n_municipios),
     })
     
     # Adicionar variáveis categóricas
-    df_municipios['CATEGORIA_ABANDONO'] = pd.cut(
+    df_municipios['CATEGORIA_ABANDONO'] = categorizar(
         df_municipios['TAXA_ABANDONO'],
-        bins=[0, 5, 10, 15, 100],
-        labels=['Baixo (0-5%)', 'Médio (5-10%)', 'Alto (10-15%)', 'Muito Alto (>15%)']
+        limites=[0, 5, 10, 15, 100],
+        rotulos=['Baixo (0-5%)', 'Médio (5-10%)', 'Alto (10-15%)', 'Muito Alto (>15%)']
     )
     
-    df_municipios['NIVEL_POBREZA'] = pd.qcut(
+    # Quartis de pobreza: limites pelos quantis, incluindo o valor mínimo na primeira faixa
+    df_municipios['NIVEL_POBREZA'] = categorizar(
         df_municipios['TAXA_POBREZA'],
-        q=4,
-        labels=['Baixo', 'Médio-Baixo', 'Médio-Alto', 'Alto']
+        limites=np.quantile(df_municipios['TAXA_POBREZA'], [0, 0.25, 0.5, 0.75, 1]),
+        rotulos=['Baixo', 'Médio-Baixo', 'Médio-Alto', 'Alto'],
+        incluir_menor=True
     )
     
     # Adicionar correlações realistas
@@ -109,25 +460,41 @@ if df_municipios is None and df_escolas is None:
         df_municipios['TAXA_ABANDONO'] + 
         0.3 * df_municipios['TAXA_POBREZA'] - 
         4 * df_municipios['IDEB'] + 
-        np.random.normal(0, 3, n_municipios)
+        rng.normal(0, 3, n_municipios)
     ).clip(0, 100)
     
     # Simulação de dados escolares
-    n_escolas = 2000
+    n_escolas = 400 if SMOKE_TEST else 2000
     
     df_escolas = pd.DataFrame({
-        'CO_ENTIDADE': np.random.randint(10000, 99999, n_escolas),
-        'CO_MUNICIPIO': np.random.choice(df_municipios['CO_MUNICIPIO'], n_escolas),
-        'CO_UF': np.random.choice(range(11, 53), n_escolas),
-        'DEPENDENCIA': np.random.choice(['Federal', 'Estadual', 'Municipal', 'Privada'], 
+        'CO_ENTIDADE': rng.integers(10000, 99999, n_escolas),
+        'CO_MUNICIPIO': rng.choice(df_municipios['CO_MUNICIPIO'], n_escolas),
+        'CO_UF': rng.choice(range(11, 53), n_escolas),
+        'DEPENDENCIA': rng.choice(['Federal', 'Estadual', 'Municipal', 'Privada'], 
                                        n_escolas, p=[0.05, 0.6, 0.15, 0.2]),
-        'LOCALIZACAO': np.random.choice(['Urbana', 'Rural'], n_escolas, p=[0.85, 0.15]),
-        'TAXA_ABANDONO': np.random.beta(2, 15, n_escolas) * 100,
-        'TOTAL_ALUNOS': np.random.randint(20, 1200, n_escolas)
+        'LOCALIZACAO': rng.choice(['Urbana', 'Rural'], n_escolas, p=[0.85, 0.15]),
+        'TAXA_ABANDONO': rng.beta(2, 15, n_escolas) * 100,
+        'TOTAL_ALUNOS': rng.integers(20, 1200, n_escolas)
     })
     
     log_message("Dados simulados criados com sucesso")
 
+# Reduzir tipos numéricos para diminuir o uso de memória nas agregações seguintes
+TIPOS_COMPACTOS = {'CO_UF': 'int8', 'CO_MUNICIPIO': 'int32', 'CO_ENTIDADE': 'int32',
+                   'TOTAL_ALUNOS': 'int32', 'TOTAL_ESCOLAS': 'int16'}
+
+def reduzir_tipos(df):
+    """Converte códigos para inteiros compactos, floats para float32 e textos para category"""
+    tipos = {col: tipo for col, tipo in TIPOS_COMPACTOS.items() if col in df.columns}
+    tipos.update({col: 'float32' for col in df.select_dtypes(include='float64').columns})
+    tipos.update({col: 'category' for col in ['DEPENDENCIA', 'LOCALIZACAO'] if col in df.columns})
+    return df.astype(tipos)
+
+if df_municipios is not None:
+    df_municipios = reduzir_tipos(df_municipios)
+if df_escolas is not None:
+    df_escolas = reduzir_tipos(df_escolas)
+
 ## 4. Análise Descritiva Global
 
 log_message("Iniciando análise descritiva global...")
@@ -140,7 +507,10 @@ if df_municipios is not None:
     print(abandono_stats)
     
     # Taxa de abandono ponderada pelo número de alunos
-    taxa_ponderada = (df_municipios['TAXA_ABANDONO'] * df_municipios['TOTAL_ALUNOS']).sum() / df_municipios['TOTAL_ALUNOS'].sum()
+    taxa_ponderada = np.average(
+        df_municipios['TAXA_ABANDONO'].to_numpy(),
+        weights=df_municipios['TOTAL_ALUNOS'].to_numpy()
+    )
     print(f"\nTaxa de abandono média: {abandono_stats['mean']:.2f}%")
     print(f"Taxa de abandono média ponderada: {taxa_ponderada:.2f}%")
     
@@ -150,101 +520,131 @@ if df_municipios is not None:
     print(dist_categorias)
     
     # Histograma da taxa de abandono
-    plt.figure(figsize=(12, 8))
-    sns.histplot(df_municipios['TAXA_ABANDONO'], kde=True, bins=30, color=cores[0])
-    plt.axvline(abandono_stats['mean'], color='red', linestyle='--', 
-               label=f'Média: {abandono_stats["mean"]:.2f}%')
-    plt.axvline(abandono_stats['50%'], color='green', linestyle='--', 
-               label=f'Mediana: {abandono_stats["50%"]:.2f}%')
-    plt.title('Distribuição da Taxa de Abandono nos Municípios', fontsize=16)
-    plt.xlabel('Taxa de Abandono (%)', fontsize=14)
-    plt.ylabel('Frequência', fontsize=14)
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    # Salvar a figura
-    plt.savefig(os.path.join(PLOTS_DIR, 'distribuicao_taxa_abandono.png'), bbox_inches='tight', dpi=300)
-    plt.close()
-    log_message("Histograma da taxa de abandono salvo com sucesso")
+    tarefas_graficos.append((grafico_histograma, dict(
+        valores=df_municipios['TAXA_ABANDONO'].to_numpy(dtype=np.float64),
+        media=abandono_stats['mean'],
+        mediana=abandono_stats['50%'],
+        nome_arquivo='distribuicao_taxa_abandono.png'
+    )))
+
+# Agregação ponderada por grupo: kernel Numba para a base completa do INEP (N >> 10 mil
+# escolas, poucos grupos); em bases pequenas o groupby do pandas/Dask já é suficiente.
+# Kernel serial de propósito: o pool de threads do numba (parallel=True) trava os
+# processos criados por fork na renderização dos gráficos (seção 7.4)
+LIMIAR_NUMBA = 100_000
+
+if NUMBA_DISPONIVEL:
+    @njit(cache=True)
+    def _somas_por_grupo(codigos, taxas, pesos, n_grupos):
+        """
+        Soma taxas, pesos e taxa x peso por grupo, em uma única passagem
+        
+        Args:
+            codigos: Códigos inteiros dos grupos (-1 para ausente)
+            taxas: Taxa de abandono de cada escola
+            pesos: Número de alunos de cada escola
+            n_grupos: Número de grupos
+            
+        Returns:
+            tuple: Arrays (soma das taxas, soma dos pesos, soma ponderada, contagem) por grupo
+        """
+        somas = np.zeros((4, n_grupos))
+        for i in range(codigos.shape[0]):
+            g = codigos[i]
+            if g >= 0:
+                somas[0, g] += taxas[i]
+                somas[1, g] += pesos[i]
+                somas[2, g] += taxas[i] * pesos[i]
+                somas[3, g] += 1.0
+        return somas[0], somas[1], somas[2], somas[3]
+
+def agregar_abandono_ponderado(df, coluna):
+    """
+    Calcula a taxa média e a taxa ponderada pelo número de alunos por categoria
+    
+    Args:
+        df: DataFrame (pandas ou Dask) de escolas
+        coluna: Coluna categórica de agrupamento
+        
+    Returns:
+        pandas.DataFrame: Colunas [coluna, TAXA_ABANDONO, TOTAL_ALUNOS, TAXA_PONDERADA]
+    """
+    if NUMBA_DISPONIVEL and isinstance(df, pd.DataFrame) and len(df) >= LIMIAR_NUMBA:
+        grupos = df[coluna].astype('category')
+        soma_taxas, soma_alunos, soma_ponderada, contagem = _somas_por_grupo(
+            grupos.cat.codes.to_numpy(),
+            df['TAXA_ABANDONO'].to_numpy(dtype=np.float64),
+            df['TOTAL_ALUNOS'].to_numpy(dtype=np.float64),
+            len(grupos.cat.categories)
+        )
+        observados = contagem > 0
+        resultado = pd.DataFrame({
+            coluna: grupos.cat.categories[observados],
+            'TAXA_ABANDONO': soma_taxas[observados] / contagem[observados],
+            'TOTAL_ALUNOS': soma_alunos[observados],
+            '_WSUM': soma_ponderada[observados]
+        })
+    else:
+        # Soma de taxa x alunos dividida pelo total de alunos, em uma única agregação
+        resultado = df.assign(
+            _WSUM=df['TAXA_ABANDONO'] * df['TOTAL_ALUNOS']
+        ).groupby(coluna, sort=False).agg(
+            TAXA_ABANDONO=('TAXA_ABANDONO', 'mean'),
+            TOTAL_ALUNOS=('TOTAL_ALUNOS', 'sum'),
+            _WSUM=('_WSUM', 'sum')
+        )
+        if USE_DASK and isinstance(resultado, dd.DataFrame):
+            resultado = resultado.compute()
+        resultado = resultado.reset_index()
+    
+    resultado['TAXA_PONDERADA'] = resultado.pop('_WSUM') / resultado['TOTAL_ALUNOS']
+    return resultado
 
 # 4.2 Análise por dependência administrativa (se dados disponíveis)
 if df_escolas is not None and 'DEPENDENCIA' in df_escolas.columns:
-    # Calcular taxa média por dependência administrativa
-    abandono_dependencia = df_escolas.groupby('DEPENDENCIA').agg({
-        'TAXA_ABANDONO': 'mean',
-        'TOTAL_ALUNOS': 'sum'
-    }).reset_index()
-    
-    # Adicionar taxa ponderada
-    abandono_dependencia['TAXA_PONDERADA'] = 0
-    total_alunos = df_escolas['TOTAL_ALUNOS'].sum()
-    
-    for i, dep in enumerate(abandono_dependencia['DEPENDENCIA']):
-        escolas_dep = df_escolas[df_escolas['DEPENDENCIA'] == dep]
-        taxa_pond = (escolas_dep['TAXA_ABANDONO'] * escolas_dep['TOTAL_ALUNOS']).sum() / escolas_dep['TOTAL_ALUNOS'].sum()
-        abandono_dependencia.loc[i, 'TAXA_PONDERADA'] = taxa_pond
+    # Calcular taxa média e taxa ponderada por dependência administrativa
+    abandono_dependencia = agregar_abandono_ponderado(df_escolas, 'DEPENDENCIA')
+    abandono_dependencia = abandono_dependencia.sort_values('TAXA_PONDERADA', ascending=False).reset_index(drop=True)
     
     print("\nTaxa de abandono por dependência administrativa:")
     print(abandono_dependencia)
     
     # Gráfico de barras
-    plt.figure(figsize=(12, 8))
-    sns.barplot(x='DEPENDENCIA', y='TAXA_PONDERADA', 
-               data=abandono_dependencia.sort_values('TAXA_PONDERADA', ascending=False),
-               palette=cores)
-    
-    plt.title('Taxa de Abandono por Dependência Administrativa', fontsize=16)
-    plt.xlabel('Dependência Administrativa', fontsize=14)
-    plt.ylabel('Taxa de Abandono (%)', fontsize=14)
-    plt.grid(True, alpha=0.3, axis='y')
-    
-    # Adicionar valores nas barras
-    for i, v in enumerate(abandono_dependencia['TAXA_PONDERADA']):
-        plt.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
-    
-    # Salvar a figura
-    plt.savefig(os.path.join(PLOTS_DIR, 'abandono_por_dependencia.png'), bbox_inches='tight', dpi=300)
-    plt.close()
-    log_message("Gráfico de abandono por dependência administrativa salvo com sucesso")
+    tarefas_graficos.append((grafico_barras, dict(
+        rotulos=abandono_dependencia['DEPENDENCIA'].astype(str).to_numpy(),
+        valores=abandono_dependencia['TAXA_PONDERADA'].to_numpy(),
+        cores_barras=cores[:len(abandono_dependencia)],
+        titulo='Taxa de Abandono por Dependência Administrativa',
+        xlabel='Dependência Administrativa',
+        ylabel='Taxa de Abandono (%)',
+        nome_arquivo='abandono_por_dependencia.png'
+    )))
 
 # 4.3 Análise por localização (urbana/rural)
 if df_escolas is not None and 'LOCALIZACAO' in df_escolas.columns:
     # Similar ao anterior, mas para localização
-    abandono_localizacao = df_escolas.groupby('LOCALIZACAO').agg({
-        'TAXA_ABANDONO': 'mean',
-        'TOTAL_ALUNOS': 'sum'
-    }).reset_index()
-    
-    # Adicionar taxa ponderada
-    abandono_localizacao['TAXA_PONDERADA'] = 0
-    
-    for i, loc in enumerate(abandono_localizacao['LOCALIZACAO']):
-        escolas_loc = df_escolas[df_escolas['LOCALIZACAO'] == loc]
-        taxa_pond = (escolas_loc['TAXA_ABANDONO'] * escolas_loc['TOTAL_ALUNOS']).sum() / escolas_loc['TOTAL_ALUNOS'].sum()
-        abandono_localizacao.loc[i, 'TAXA_PONDERADA'] = taxa_pond
+    abandono_localizacao = agregar_abandono_ponderado(df_escolas, 'LOCALIZACAO')
     
     print("\nTaxa de abandono por localização:")
     print(abandono_localizacao)
     
     # Gráfico de barras
-    plt.figure(figsize=(10, 6))
-    sns.barplot(x='LOCALIZACAO', y='TAXA_PONDERADA', 
-               data=abandono_localizacao,
-               palette=cores)
-    
-    plt.title('Taxa de Abandono por Localização', fontsize=16)
-    plt.xlabel('Localização', fontsize=14)
-    plt.ylabel('Taxa de Abandono (%)', fontsize=14)
-    plt.grid(True, alpha=0.3, axis='y')
-    
-    # Adicionar valores nas barras
-    for i, v in enumerate(abandono_localizacao['TAXA_PONDERADA']):
-        plt.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
-    
-    # Salvar a figura
-    plt.savefig(os.path.join(PLOTS_DIR, 'abandono_por_localizacao.png'), bbox_inches='tight', dpi=300)
-    plt.close()
-    log_message("Gráfico de abandono por localização salvo com sucesso")
+    tarefas_graficos.append((grafico_barras, dict(
+        rotulos=abandono_localizacao['LOCALIZACAO'].astype(str).to_numpy(),
+        valores=abandono_localizacao['TAXA_PONDERADA'].to_numpy(),
+        cores_barras=cores[:len(abandono_localizacao)],
+        titulo='Taxa de Abandono por Localização',
+        xlabel='Localização',
+        ylabel='Taxa de Abandono (%)',
+        nome_arquivo='abandono_por_localizacao.png',
+        figsize=(10, 6)
+    )))
+
+# A base de escolas só é usada nas seções 4.2 e 4.3: liberar antes das próximas fases
+# (os processos de renderização da seção 7.4 herdam a memória do processo atual)
+if df_escolas is not None:
+    del df_escolas
+    gc.collect()
 
 ## 5. Análise de Correlações
 
@@ -260,71 +660,53 @@ if df_municipios is not None:
     var_existentes = [var for var in var_numericas if var in df_municipios.columns]
     
     if len(var_existentes) >= 2:
-        # Calcular matriz de correlação
-        corr_matrix = df_municipios[var_existentes].corr().round(3)
+        # Centralizar o bloco de variáveis uma única vez (dados sem ausentes); a matriz
+        # de Gram resultante é reaproveitada na correlação e na regressão da seção 7.3
+        arr = df_municipios[var_existentes].to_numpy(dtype=np.float32)
+        medias = arr.mean(axis=0, dtype=np.float64)
+        Xc = arr - medias.astype(np.float32)
+        
+        # Matriz de Gram centralizada (estatísticas suficientes da correlação e da regressão)
+        gram = (Xc.T @ Xc).astype(np.float64)
+        normas = np.sqrt(np.diag(gram))
+        
+        # Apenas a matriz de Gram (k x k) é necessária daqui em diante
+        del arr, Xc
+        
+        # Correlação de Pearson a partir da matriz de Gram normalizada
+        corr_matrix = pd.DataFrame(
+            gram / np.outer(normas, normas),
+            index=var_existentes,
+            columns=var_existentes
+        ).round(3)
         print("\nMatriz de correlação:")
         print(corr_matrix)
         
         # Visualizar correlações como mapa de calor
-        plt.figure(figsize=(12, 10))
-        mask = np.triu(np.ones_like(corr_matrix))
-        cmap = sns.diverging_palette(230, 20, as_cmap=True)
-        
-        sns.heatmap(corr_matrix, mask=mask, cmap=cmap, vmax=1, vmin=-1, center=0,
-                    annot=True, fmt='.2f', square=True, linewidths=.5)
-        
-        plt.title('Correlação entre Variáveis', fontsize=16)
-        plt.tight_layout()
-        
-        # Salvar o mapa de calor
-        plt.savefig(os.path.join(PLOTS_DIR, 'mapa_correlacao.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Mapa de correlação salvo com sucesso")
+        tarefas_graficos.append((grafico_mapa_correlacao, dict(
+            corr_matrix=corr_matrix,
+            nome_arquivo='mapa_correlacao.png'
+        )))
         
         # 5.2 Visualizar correlações com a taxa de abandono
         correlacoes_abandono = corr_matrix['TAXA_ABANDONO'].drop('TAXA_ABANDONO').sort_values(ascending=False)
         
-        plt.figure(figsize=(12, 8))
-        bars = plt.barh(
-            correlacoes_abandono.index, 
-            correlacoes_abandono.values,
-            color=[cores[1] if x > 0 else cores[0] for x in correlacoes_abandono.values]
-        )
-        
-        plt.title('Correlação com Taxa de Abandono', fontsize=16)
-        plt.xlabel('Coeficiente de Correlação', fontsize=14)
-        plt.grid(True, alpha=0.3, axis='x')
-        plt.axvline(x=0, color='k', linestyle='-', alpha=0.3)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'correlacoes_abandono.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de correlações com taxa de abandono salvo com sucesso")
+        tarefas_graficos.append((grafico_correlacoes_abandono, dict(
+            correlacoes_abandono=correlacoes_abandono,
+            nome_arquivo='correlacoes_abandono.png'
+        )))
         
         # 5.3 Scatterplots para as principais correlações
         top_correlacoes = correlacoes_abandono.abs().sort_values(ascending=False).head(3).index
         
-        for var in top_correlacoes:
-            plt.figure(figsize=(10, 8))
-            sns.regplot(x=var, y='TAXA_ABANDONO', data=df_municipios, 
-                      scatter_kws={'alpha':0.5}, line_kws={'color':cores[2]})
-            
-            plt.title(f'Relação entre {var} e Taxa de Abandono', fontsize=16)
-            plt.xlabel(var, fontsize=14)
-            plt.ylabel('Taxa de Abandono (%)', fontsize=14)
-            plt.grid(True, alpha=0.3)
-            
-            # Calcular e mostrar correlação
-            corr_valor = np.corrcoef(df_municipios[var], df_municipios['TAXA_ABANDONO'])[0, 1]
-            plt.annotate(f'Correlação: {corr_valor:.4f}', 
-                       xy=(0.05, 0.95), xycoords='axes fraction',
-                       bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
-            
-            # Salvar o gráfico
-            plt.savefig(os.path.join(PLOTS_DIR, f'scatter_{var}_abandono.png'), bbox_inches='tight', dpi=300)
-            plt.close()
-        
-        log_message("Gráficos de dispersão salvos com sucesso")
+        # Um único painel com as três dispersões lado a lado (eixo y compartilhado)
+        tarefas_graficos.append((grafico_dispersoes, dict(
+            x_vars=df_municipios[list(top_correlacoes)].to_numpy(dtype=np.float64),
+            y_var=df_municipios['TAXA_ABANDONO'].to_numpy(dtype=np.float64),
+            variaveis=list(top_correlacoes),
+            correlacoes=corr_matrix.loc[top_correlacoes, 'TAXA_ABANDONO'].to_numpy(),
+            nome_arquivo='scatter_top_correlacoes_abandono.png'
+        )))
 
 ## 6. Análise por Grupos e Categorias
 
@@ -340,30 +722,23 @@ if df_municipios is not None:
         print(abandono_por_pobreza)
         
         # Gráfico de barras
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x='NIVEL_POBREZA', y='mean', data=abandono_por_pobreza, palette='Blues')
-        
-        plt.title('Taxa Média de Abandono por Nível de Pobreza', fontsize=16)
-        plt.xlabel('Nível de Pobreza', fontsize=14)
-        plt.ylabel('Taxa Média de Abandono (%)', fontsize=14)
-        plt.grid(True, alpha=0.3, axis='y')
-        
-        # Adicionar valores nas barras
-        for i, v in enumerate(abandono_por_pobreza['mean']):
-            plt.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'abandono_por_nivel_pobreza.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de abandono por nível de pobreza salvo com sucesso")
+        tarefas_graficos.append((grafico_barras, dict(
+            rotulos=abandono_por_pobreza['NIVEL_POBREZA'].astype(str).to_numpy(),
+            valores=abandono_por_pobreza['mean'].to_numpy(),
+            cores_barras=matplotlib.colormaps['Blues'](np.linspace(0.4, 0.9, len(abandono_por_pobreza))),
+            titulo='Taxa Média de Abandono por Nível de Pobreza',
+            xlabel='Nível de Pobreza',
+            ylabel='Taxa Média de Abandono (%)',
+            nome_arquivo='abandono_por_nivel_pobreza.png'
+        )))
     
     # 6.2 Análise por IDEB (categorizado)
     if 'IDEB' in df_municipios.columns:
         # Categorizar IDEB
-        df_municipios['CATEGORIA_IDEB'] = pd.cut(
+        df_municipios['CATEGORIA_IDEB'] = categorizar(
             df_municipios['IDEB'],
-            bins=[0, 3, 4, 5, 10],
-            labels=['Crítico (<3)', 'Baixo (3-4)', 'Intermediário (4-5)', 'Adequado (>5)']
+            limites=[0, 3, 4, 5, 10],
+            rotulos=['Crítico (<3)', 'Baixo (3-4)', 'Intermediário (4-5)', 'Adequado (>5)']
         )
         
         abandono_por_ideb = df_municipios.groupby('CATEGORIA_IDEB')['TAXA_ABANDONO'].agg(
@@ -373,22 +748,15 @@ if df_municipios is not None:
         print(abandono_por_ideb)
         
         # Gráfico de barras
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x='CATEGORIA_IDEB', y='mean', data=abandono_por_ideb, palette='Greens')
-        
-        plt.title('Taxa Média de Abandono por Categoria de IDEB', fontsize=16)
-        plt.xlabel('Categoria de IDEB', fontsize=14)
-        plt.ylabel('Taxa Média de Abandono (%)', fontsize=14)
-        plt.grid(True, alpha=0.3, axis='y')
-        
-        # Adicionar valores nas barras
-        for i, v in enumerate(abandono_por_ideb['mean']):
-            plt.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'abandono_por_categoria_ideb.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de abandono por categoria de IDEB salvo com sucesso")
+        tarefas_graficos.append((grafico_barras, dict(
+            rotulos=abandono_por_ideb['CATEGORIA_IDEB'].astype(str).to_numpy(),
+            valores=abandono_por_ideb['mean'].to_numpy(),
+            cores_barras=matplotlib.colormaps['Greens'](np.linspace(0.4, 0.9, len(abandono_por_ideb))),
+            titulo='Taxa Média de Abandono por Categoria de IDEB',
+            xlabel='Categoria de IDEB',
+            ylabel='Taxa Média de Abandono (%)',
+            nome_arquivo='abandono_por_categoria_ideb.png'
+        )))
     
     # 6.3 Análise por região geográfica (UF)
     if 'CO_UF' in df_municipios.columns:
@@ -401,30 +769,35 @@ if df_municipios is not None:
             50: 'MS', 51: 'MT', 52: 'GO', 53: 'DF'
         }
         
-        df_municipios['UF'] = df_municipios['CO_UF'].map(mapa_uf)
+        # Tabela de consulta indexada pelo código da UF (códigos densos, < 128):
+        # cada posição guarda o código categórico da sigla, ou -1 se a UF não existir
+        siglas_uf = list(mapa_uf.values())
+        lut_uf = np.full(128, -1, dtype=np.int8)
+        lut_uf[list(mapa_uf.keys())] = np.arange(len(siglas_uf))
         
-        abandono_por_uf = df_municipios.groupby('UF')['TAXA_ABANDONO'].agg(
+        df_municipios['UF'] = pd.Categorical.from_codes(
+            np.take(lut_uf, df_municipios['CO_UF'].to_numpy(), mode='clip'),
+            categories=siglas_uf
+        )
+        
+        abandono_por_uf = df_municipios.groupby('UF', observed=True)['TAXA_ABANDONO'].agg(
             ['mean', 'median', 'std', 'count']).reset_index()
         
         abandono_por_uf = abandono_por_uf.sort_values('mean', ascending=False)
         
         # Gráfico de barras (top 10 UFs com maior abandono)
-        plt.figure(figsize=(14, 8))
-        sns.barplot(x='UF', y='mean', data=abandono_por_uf.head(10), palette='Reds')
-        
-        plt.title('Estados com Maiores Taxas de Abandono Escolar', fontsize=16)
-        plt.xlabel('Unidade Federativa', fontsize=14)
-        plt.ylabel('Taxa Média de Abandono (%)', fontsize=14)
-        plt.grid(True, alpha=0.3, axis='y')
-        
-        # Adicionar valores nas barras
-        for i, v in enumerate(abandono_por_uf.head(10)['mean']):
-            plt.text(i, v + 0.5, f'{v:.2f}%', ha='center', fontsize=12)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'abandono_por_uf_top10.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de abandono por UF salvo com sucesso")
+        top10_uf = abandono_por_uf.head(10)
+        
+        tarefas_graficos.append((grafico_barras, dict(
+            rotulos=top10_uf['UF'].to_numpy(),
+            valores=top10_uf['mean'].to_numpy(),
+            cores_barras=matplotlib.colormaps['Reds'](np.linspace(0.9, 0.4, len(top10_uf))),
+            titulo='Estados com Maiores Taxas de Abandono Escolar',
+            xlabel='Unidade Federativa',
+            ylabel='Taxa Média de Abandono (%)',
+            nome_arquivo='abandono_por_uf_top10.png',
+            figsize=(14, 8)
+        )))
 
 ## 7. Análise Bivariada e Multivariada
 
@@ -433,105 +806,101 @@ if df_municipios is not None:
     
     # 7.1 Relação entre pobreza, IDEB e abandono
     if all(var in df_municipios.columns for var in ['TAXA_POBREZA', 'IDEB', 'TAXA_ABANDONO']):
-        plt.figure(figsize=(12, 8))
-        
-        sns.scatterplot(
-            x='TAXA_POBREZA', 
-            y='TAXA_ABANDONO',
-            hue='IDEB',
-            size='TOTAL_ALUNOS',
-            sizes=(20, 200),
-            palette='viridis',
-            data=df_municipios,
-            alpha=0.7
-        )
-        
-        plt.title('Relação entre Pobreza, IDEB e Abandono Escolar', fontsize=16)
-        plt.xlabel('Taxa de Pobreza (%)', fontsize=14)
-        plt.ylabel('Taxa de Abandono (%)', fontsize=14)
-        plt.grid(True, alpha=0.3)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'relacao_pobreza_ideb_abandono.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de relação multivariada salvo com sucesso")
+        tarefas_graficos.append((grafico_multivariado, dict(
+            dados=df_municipios[['TAXA_POBREZA', 'TAXA_ABANDONO', 'IDEB', 'TOTAL_ALUNOS']],
+            nome_arquivo='relacao_pobreza_ideb_abandono.png'
+        )))
     
-    # 7.2 Pairplot para as principais variáveis
-    if all(var in df_municipios.columns for var in ['TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA']):
+    # 7.2 Pairplot para as principais variáveis (4x4 painéis; omitido no SMOKE_TEST)
+    if not SMOKE_TEST and all(var in df_municipios.columns for var in ['TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA']):
         vars_pairplot = ['TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA']
         
-        # Criar amostra aleatória para pairplot (para melhor visualização)
-        amostra = df_municipios.sample(min(300, len(df_municipios)), random_state=42)
-        
-        pairplot = sns.pairplot(
-            amostra[vars_pairplot],
-            diag_kind='kde',
-            plot_kws={'alpha': 0.6, 's': 30, 'edgecolor': 'k', 'linewidth': 0.5},
-            corner=True
-        )
-        
-        pairplot.fig.suptitle('Relações entre Variáveis-Chave', y=1.02, fontsize=16)
+        # Criar amostra aleatória para pairplot (para melhor visualização): sortear só
+        # os índices das linhas, sem permutar o DataFrame inteiro
+        rng_amostra = np.random.default_rng(42)
+        idx_amostra = rng_amostra.choice(len(df_municipios), size=min(300, len(df_municipios)), replace=False)
+        amostra = df_municipios[vars_pairplot].iloc[idx_amostra]
         
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'pairplot_variaveis_chave.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Pairplot de variáveis-chave salvo com sucesso")
+        tarefas_graficos.append((grafico_pairplot, dict(
+            amostra=amostra,
+            nome_arquivo='pairplot_variaveis_chave.png'
+        )))
+        del amostra, idx_amostra
     
     # 7.3 Análise de Regressão Linear Múltipla
-    if all(var in df_municipios.columns for var in ['TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA', 'TAXA_DESEMPREGO']):
+    if 'gram' in locals() and all(var in var_existentes for var in ['TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA', 'TAXA_DESEMPREGO']):
         log_message("Realizando análise de regressão múltipla...")
         
         # Variáveis para o modelo
         X_vars = ['TAXA_POBREZA', 'IDEB', 'PIB_PER_CAPITA', 'TAXA_DESEMPREGO']
         y_var = 'TAXA_ABANDONO'
         
-        # Preparar os dados
-        X = df_municipios[X_vars]
-        y = df_municipios[y_var]
-        
-        # Adicionar constante para o intercepto
-        X = sm.add_constant(X)
-        
-        # Ajustar modelo
-        model = sm.OLS(y, X).fit()
+        # Estatísticas suficientes: blocos X'X, X'y e y'y da matriz de Gram da seção 5.1
+        # (dados centralizados, então o intercepto é recuperado pelas médias)
+        idx_x = [var_existentes.index(var) for var in X_vars]
+        idx_y = var_existentes.index(y_var)
+        XtX = gram[np.ix_(idx_x, idx_x)]
+        Xty = gram[idx_x, idx_y]
+        yty = gram[idx_y, idx_y]
+        
+        # Resolver as equações normais (sistema p x p) em vez de fatorar a matriz N x p
+        beta = np.linalg.solve(XtX, Xty)
+        intercepto = medias[idx_y] - medias[idx_x] @ beta
+        
+        # Erros padrão, estatísticas t e p-valores dos coeficientes
+        graus_liberdade = len(df_municipios) - len(X_vars) - 1
+        soma_residuos = yty - beta @ Xty
+        sigma2 = soma_residuos / graus_liberdade
+        erros_padrao = np.sqrt(sigma2 * np.diag(np.linalg.inv(XtX)))
+        t_valores = beta / erros_padrao
+        p_valores = 2 * stats.t.sf(np.abs(t_valores), graus_liberdade)
+        r2_modelo = 1 - soma_residuos / yty
         
         # Exibir resumo do modelo
         print("\nResultados da Regressão Linear Múltipla:")
-        print(model.summary())
+        print(f"Observações: {len(df_municipios)}  R²: {r2_modelo:.4f}  Intercepto: {intercepto:.4f}")
+        print(pd.DataFrame({
+            'Coeficiente': beta,
+            'Erro padrão': erros_padrao,
+            't': t_valores,
+            'P-valor': p_valores
+        }, index=X_vars).round(4))
         
         # Salvar coeficientes para uso posterior
         coefs = pd.DataFrame({
             'Variável': X_vars,
-            'Coeficiente': model.params[1:],
-            'P-valor': model.pvalues[1:],
-            'Significativo': model.pvalues[1:] < 0.05
+            'Coeficiente': beta,
+            'P-valor': p_valores,
+            'Significativo': p_valores < 0.05
         })
         
-        coefs.to_csv(os.path.join(RESULTS_DIR, 'coeficientes_regressao.csv'), index=False)
-        log_message("Coeficientes de regressão salvos em arquivo CSV")
+        coefs.to_parquet(os.path.join(RESULTS_DIR, 'coeficientes_regressao.parquet'), engine='pyarrow', compression='zstd', index=False)
+        log_message("Coeficientes de regressão salvos em arquivo Parquet")
         
         # Gráfico de coeficientes
-        plt.figure(figsize=(12, 8))
-        coefs['Cor'] = coefs['Coeficiente'].apply(lambda x: cores[1] if x > 0 else cores[0])
-        
-        sns.barplot(x='Variável', y='Coeficiente', data=coefs, palette=coefs['Cor'])
-        
-        plt.title('Coeficientes de Regressão para Taxa de Abandono', fontsize=16)
-        plt.xlabel('Variável', fontsize=14)
-        plt.ylabel('Coeficiente', fontsize=14)
-        plt.grid(True, alpha=0.3, axis='y')
-        plt.axhline(y=0, color='k', linestyle='-', alpha=0.3)
-        
-        # Adicionar marcador para significância estatística
-        for i, row in enumerate(coefs.itertuples()):
-            if row.Significativo:
-                plt.text(i, row.Coeficiente + (0.3 if row.Coeficiente > 0 else -0.3), 
-                       '*', ha='center', fontsize=20)
-        
-        # Salvar o gráfico
-        plt.savefig(os.path.join(PLOTS_DIR, 'coeficientes_regressao.png'), bbox_inches='tight', dpi=300)
-        plt.close()
-        log_message("Gráfico de coeficientes de regressão salvo com sucesso")
+        coefs['Cor'] = np.where(coefs['Coeficiente'] > 0, cores[1], cores[0])
+        tarefas_graficos.append((grafico_coeficientes, dict(
+            coefs=coefs,
+            nome_arquivo='coeficientes_regressao.png'
+        )))
+
+## 7.4 Renderização dos Gráficos
+
+# Os gráficos são independentes entre si: renderizar em paralelo, um por processo. Só com
+# fork: os processos herdam as funções definidas neste notebook, enquanto com spawn
+# (Windows, padrão do macOS) cada um reexecutaria o notebook inteiro; nesse caso, em série
+if tarefas_graficos:
+    gc.collect()
+    if 'fork' in mp.get_all_start_methods():
+        log_message(f"Renderizando {len(tarefas_graficos)} gráficos em paralelo...")
+        with ProcessPoolExecutor(max_workers=min(len(tarefas_graficos), os.cpu_count() or 1),
+                                 mp_context=mp.get_context('fork')) as executor:
+            for nome_arquivo in executor.map(_renderizar_grafico, tarefas_graficos):
+                log_message(f"Gráfico {nome_arquivo} salvo com sucesso")
+    else:
+        log_message(f"Renderizando {len(tarefas_graficos)} gráficos em série...")
+        for nome_arquivo in map(_renderizar_grafico, tarefas_graficos):
+            log_message(f"Gráfico {nome_arquivo} salvo com sucesso")
 
 ## 8. Análise de Distribuição Espacial
 
@@ -541,48 +910,51 @@ log_message("Visualizações espaciais serão geradas no notebook de análise es
 
 log_message("Resumindo principais descobertas da análise exploratória...")
 
-# Criar DataFrame para armazenar insights principais
-insights = pd.DataFrame(columns=['Categoria', 'Descoberta', 'Implicação'])
+# Acumular insights principais em uma lista de registros
+registros_insights = []
 
 # Adicionar insights (exemplos - seriam derivados da análise real)
-insights = insights.append({
+registros_insights.append({
     'Categoria': 'Distribuição',
     'Descoberta': f'A taxa média de abandono é de {abandono_stats["mean"]:.2f}%, com grande variabilidade entre municípios (std = {abandono_stats["std"]:.2f}%)',
     'Implicação': 'Existe heterogeneidade significativa no fenômeno, sugerindo fatores locais relevantes'
-}, ignore_index=True)
+})
 
 if 'correlacoes_abandono' in locals():
     top_var = correlacoes_abandono.abs().idxmax()
     top_corr = correlacoes_abandono.loc[top_var]
     
-    insights = insights.append({
+    registros_insights.append({
         'Categoria': 'Correlações',
         'Descoberta': f'A variável mais fortemente correlacionada com abandono é {top_var} (r = {top_corr:.2f})',
         'Implicação': f'{"Aumentos" if top_corr > 0 else "Reduções"} em {top_var} estão associados a {"aumentos" if top_corr > 0 else "reduções"} na taxa de abandono'
-    }, ignore_index=True)
+    })
 
 if 'abandono_por_pobreza' in locals():
     dif_pobreza = abandono_por_pobreza.loc[abandono_por_pobreza['NIVEL_POBREZA'] == 'Alto', 'mean'].values[0] - \
                  abandono_por_pobreza.loc[abandono_por_pobreza['NIVEL_POBREZA'] == 'Baixo', 'mean'].values[0]
     
-    insights = insights.append({
+    registros_insights.append({
         'Categoria': 'Desigualdade',
         'Descoberta': f'Municípios com alto nível de pobreza têm taxa de abandono {dif_pobreza:.2f}% maior que municípios com baixo nível',
         'Implicação': 'A desigualdade socioeconômica é um fator crítico no abandono escolar'
-    }, ignore_index=True)
+    })
 
-if 'model' in locals():
-    r2 = model.rsquared
+if 'r2_modelo' in locals():
+    r2 = r2_modelo
     var_sig = coefs[coefs['Significativo']]['Variável'].tolist()
     
-    insights = insights.append({
+    registros_insights.append({
         'Categoria': 'Modelagem',
         'Descoberta': f'O modelo explicativo captura {r2:.2%} da variação na taxa de abandono, com {len(var_sig)} variáveis significativas',
         'Implicação': 'Conjunto relativamente pequeno de fatores pode explicar grande parte do fenômeno'
-    }, ignore_index=True)
+    })
+
+# Criar DataFrame com os insights em uma única construção
+insights = pd.DataFrame(registros_insights, columns=['Categoria', 'Descoberta', 'Implicação'])
 
-# Salvar insights em arquivo CSV
-insights.to_csv(os.path.join(RESULTS_DIR, 'insights_analise_exploratoria.csv'), index=False)
+# Salvar insights em arquivo Parquet
+insights.to_parquet(os.path.join(RESULTS_DIR, 'insights_analise_exploratoria.parquet'), engine='pyarrow', compression='zstd', index=False)
 print("\nPrincipais insights da análise exploratória:")
 print(insights)
 
@@ -10,10 +10,23 @@ Este notebook implementa a integração de múltiplas fontes de dados educaciona
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime
+import logging
 import warnings
 warnings.filterwarnings('ignore')
 
+# Numba é opcional: calcula as estatísticas de qualidade em uma única passagem
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
+
+# Execução em escala INEP: USE_POLARS=1 agrega as matrículas por escola com uma consulta
+# preguiçosa do Polars, sem materializar a base completa do Censo no pandas
+USE_POLARS = os.environ.get('USE_POLARS', '0') == '1'
+if USE_POLARS:
+    import polars as pl
+
 # Definir diretórios
 BASE_DIR = os.path.dirname(os.path.abspath('__file__'))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
@@ -26,109 +39,198 @@ for directory in [DATA_DIR, RAW_DIR, PROCESSED_DIR, RESULTS_DIR]:
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-# Função para registrar log
-def log_message(message, level="INFO"):
-    """Registra mensagens de log com timestamp"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {level}: {message}")
-
-log_message("Ambiente configurado com sucesso")
+# Configurar logging (formatação feita apenas quando a mensagem é emitida)
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] %(levelname)s: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+logger = logging.getLogger("integracao_fontes")
+
+if NUMBA_DISPONIVEL:
+    @njit(parallel=True, cache=True)
+    def _estatisticas_qa_numba(abandono, pobreza, ideb):
+        n = abandono.shape[0]
+        n_invalidas = 0
+        sa = sp = si = saa = spp = sii = sap = sai = 0.0
+        for i in prange(n):
+            a = abandono[i]
+            if a < 0.0 or a > 100.0:
+                n_invalidas += 1
+            a = min(max(a, 0.0), 100.0)
+            p = pobreza[i]
+            d = ideb[i]
+            sa += a
+            sp += p
+            si += d
+            saa += a * a
+            spp += p * p
+            sii += d * d
+            sap += a * p
+            sai += a * d
+        corr_pobreza = (n * sap - sa * sp) / np.sqrt((n * saa - sa * sa) * (n * spp - sp * sp))
+        corr_ideb = (n * sai - sa * si) / np.sqrt((n * saa - sa * sa) * (n * sii - si * si))
+        return n_invalidas, corr_pobreza, corr_ideb
+
+def estatisticas_qa(abandono, pobreza, ideb):
+    """
+    Calcula em uma passagem as estatísticas de consistência da taxa de abandono
+    
+    Args:
+        abandono: Array float64 com a taxa de abandono (%)
+        pobreza: Array float64 com a taxa de pobreza (%)
+        ideb: Array float64 com o IDEB
+        
+    Returns:
+        tuple: (taxas fora de [0, 100], correlação com pobreza, correlação com IDEB),
+        com as correlações calculadas sobre a taxa já limitada a [0, 100]
+    """
+    if NUMBA_DISPONIVEL:
+        return _estatisticas_qa_numba(abandono, pobreza, ideb)
+    
+    n_invalidas = int(((abandono < 0) | (abandono > 100)).sum())
+    corr = np.corrcoef(np.vstack([np.clip(abandono, 0, 100), pobreza, ideb]))
+    return n_invalidas, corr[0, 1], corr[0, 2]
+
+def categorizar(valores, limites, rotulos, incluir_menor=False):
+    """
+    Classifica valores em faixas (a, b] via busca binária, como pd.cut, sem IntervalIndex
+    
+    Args:
+        valores: Array ou Series numérica a ser classificada
+        limites: Limites crescentes das faixas (len(rotulos) + 1 valores)
+        rotulos: Rótulos das faixas
+        incluir_menor: Se True, o limite inferior pertence à primeira faixa (como pd.qcut)
+        
+    Returns:
+        pd.Categorical ordenado com códigos int8; valores fora das faixas viram NaN
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    codigos = np.searchsorted(limites, valores, side='left') - 1
+    if incluir_menor:
+        codigos[valores == limites[0]] = 0
+    codigos[(codigos < 0) | (codigos >= len(rotulos))] = -1
+    return pd.Categorical.from_codes(codigos.astype(np.int8), categories=rotulos, ordered=True)
+
+def decodificar(codigos, categorias, primeiro_codigo=1):
+    """Converte códigos INEP sequenciais em Categorical; códigos fora da faixa viram NaN"""
+    codigos = codigos.to_numpy(dtype=np.int16) - primeiro_codigo
+    codigos[(codigos < 0) | (codigos >= len(categorias))] = -1
+    return pd.Categorical.from_codes(codigos.astype(np.int8), categories=categorias)
+
+logger.info("Ambiente configurado com sucesso")
 
 ## 3. Carregamento dos Dados Coletados
 
 # Definir ano de referência
 ano_referencia = 2022
 
+# Restringir a leitura a uma UF (None = todas), aproveitando o particionamento por CO_UF
+uf_filtro = None
+
+# Colunas do Censo efetivamente usadas no pipeline (as demais não são lidas do disco)
+COLUNAS_CENSO = [
+    'NU_ANO_CENSO', 'CO_UF', 'CO_MUNICIPIO', 'CO_ENTIDADE', 'TP_DEPENDENCIA', 'TP_LOCALIZACAO',
+    'TP_SEXO', 'TP_COR_RACA', 'NU_IDADE', 'TP_ETAPA_ENSINO', 'TP_SITUACAO'
+]
+
 # Carregar dados do Censo Escolar
-arquivo_censo = os.path.join(PROCESSED_DIR, f"amostra_censo_escolar_{ano_referencia}_ensino_medio.csv")
+arquivo_censo = os.path.join(PROCESSED_DIR, f"amostra_censo_escolar_{ano_referencia}_ensino_medio.parquet")
+consulta_censo = None
 try:
-    if os.path.exists(arquivo_censo):
-        df_censo = pd.read_csv(arquivo_censo)
-        log_message(f"Dados do Censo Escolar carregados: {df_censo.shape[0]} registros")
+    if USE_POLARS and os.path.exists(arquivo_censo):
+        # Apenas declara a leitura do dataset particionado; o filtro de UF é empurrado para o scan
+        consulta_censo = pl.scan_parquet(
+            os.path.join(arquivo_censo, '**', '*.parquet'), hive_partitioning=True
+        )
+        if uf_filtro is not None:
+            consulta_censo = consulta_censo.filter(pl.col('CO_UF') == uf_filtro)
+        df_censo = None
+        logger.info("Dados do Censo Escolar mapeados para consulta preguiçosa (Polars)")
+    elif os.path.exists(arquivo_censo):
+        df_censo = pd.read_parquet(
+            arquivo_censo,
+            columns=COLUNAS_CENSO,
+            filters=[('CO_UF', '=', uf_filtro)] if uf_filtro is not None else None
+        )
+        # Coluna de partição é lida como categórica
+        df_censo['CO_UF'] = df_censo['CO_UF'].astype('int8')
+        logger.info("Dados do Censo Escolar carregados: %d registros", df_censo.shape[0])
     else:
-        log_message(f"Arquivo {arquivo_censo} não encontrado. Usando dados simulados.", "WARNING")
+        logger.warning("Arquivo %s não encontrado. Usando dados simulados.", arquivo_censo)
         # Criar dados simulados para demonstração
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_registros = 5000
         
+        # Tipos compactos já na construção (códigos pequenos em int8, identificadores em int32)
         df_censo = pd.DataFrame({
-            'NU_ANO_CENSO': [ano_referencia] * n_registros,
-            'CO_UF': np.random.randint(11, 53, n_registros),
-            'CO_MUNICIPIO': np.random.randint(1000000, 9999999, n_registros),
-            'CO_ENTIDADE': np.random.randint(10000, 99999, n_registros),
-            'TP_DEPENDENCIA': np.random.choice([1, 2, 3, 4], n_registros),  # 1=Federal, 2=Estadual, 3=Municipal, 4=Privada
-            'TP_LOCALIZACAO': np.random.choice([1, 2], n_registros),  # 1=Urbana, 2=Rural
-            'TP_SEXO': np.random.choice([1, 2], n_registros),  # 1=Masculino, 2=Feminino
-            'TP_COR_RACA': np.random.choice([0, 1, 2, 3, 4, 5], n_registros),  # 0=Não declarada, 1=Branca, 2=Preta, etc.
-            'NU_IDADE': np.random.randint(14, 21, n_registros),
-            'TP_ETAPA_ENSINO': np.random.choice(range(25, 38), n_registros),
-            'TP_SITUACAO': np.random.choice([1, 2, 3, 4], n_registros, p=[0.7, 0.15, 0.05, 0.1])  # 1=Aprovado, 2=Reprovado, 3=Transferido, 4=Abandono
+            'NU_ANO_CENSO': np.full(n_registros, ano_referencia, dtype=np.int16),
+            'CO_UF': rng.integers(11, 53, n_registros, dtype=np.int8),
+            'CO_MUNICIPIO': rng.integers(1000000, 9999999, n_registros, dtype=np.int32),
+            'CO_ENTIDADE': rng.integers(10000, 99999, n_registros, dtype=np.int32),
+            'TP_DEPENDENCIA': rng.choice([1, 2, 3, 4], n_registros).astype(np.int8),  # 1=Federal, 2=Estadual, 3=Municipal, 4=Privada
+            'TP_LOCALIZACAO': rng.choice([1, 2], n_registros).astype(np.int8),  # 1=Urbana, 2=Rural
+            'TP_SEXO': rng.choice([1, 2], n_registros).astype(np.int8),  # 1=Masculino, 2=Feminino
+            'TP_COR_RACA': rng.choice([0, 1, 2, 3, 4, 5], n_registros).astype(np.int8),  # 0=Não declarada, 1=Branca, 2=Preta, etc.
+            'NU_IDADE': rng.integers(14, 21, n_registros, dtype=np.int8),
+            'TP_ETAPA_ENSINO': rng.choice(range(25, 38), n_registros).astype(np.int8),
+            'TP_SITUACAO': (rng.choice(4, n_registros, p=[0.7, 0.15, 0.05, 0.1]) + 1).astype(np.int8)  # 1=Aprovado, 2=Reprovado, 3=Transferido, 4=Abandono
         })
         
-        log_message("Dados simulados do Censo Escolar criados para demonstração")
+        logger.info("Dados simulados do Censo Escolar criados para demonstração")
 except Exception as e:
-    log_message(f"Erro ao carregar dados do Censo Escolar: {str(e)}", "ERROR")
+    logger.error("Erro ao carregar dados do Censo Escolar: %s", e)
     df_censo = None
 
+# Garantir inteiros no menor tipo possível, qualquer que seja a origem dos dados
+if df_censo is not None:
+    colunas_inteiras = df_censo.select_dtypes(include='integer').columns
+    df_censo[colunas_inteiras] = df_censo[colunas_inteiras].apply(pd.to_numeric, downcast='integer')
+
 # Carregar dados do SAEB (similar para as outras fontes)...
 
 ## 4. Padronização e Normalização
 
 # 4.1 Padronizar variáveis-chave no Censo Escolar
 if df_censo is not None:
-    log_message("Padronizando variáveis do Censo Escolar...")
+    logger.info("Padronizando variáveis do Censo Escolar...")
     
     # Criar variável de abandono
-    df_censo['ABANDONO'] = (df_censo['TP_SITUACAO'] == 4).astype(int)
-    
-    # Mapear códigos para categorias
-    df_censo['DEPENDENCIA'] = df_censo['TP_DEPENDENCIA'].map({
-        1: 'Federal', 
-        2: 'Estadual', 
-        3: 'Municipal', 
-        4: 'Privada'
-    })
+    df_censo['ABANDONO'] = (df_censo['TP_SITUACAO'].to_numpy() == 4).astype(np.int8)
     
-    df_censo['LOCALIZACAO'] = df_censo['TP_LOCALIZACAO'].map({
-        1: 'Urbana', 
-        2: 'Rural'
-    })
+    # Mapear códigos para categorias (códigos int8 + categorias, sem colunas de strings)
+    df_censo['DEPENDENCIA'] = decodificar(
+        df_censo['TP_DEPENDENCIA'], ['Federal', 'Estadual', 'Municipal', 'Privada']
+    )
     
-    df_censo['SEXO'] = df_censo['TP_SEXO'].map({
-        1: 'Masculino', 
-        2: 'Feminino'
-    })
+    df_censo['LOCALIZACAO'] = decodificar(
+        df_censo['TP_LOCALIZACAO'], ['Urbana', 'Rural']
+    )
     
-    df_censo['COR_RACA'] = df_censo['TP_COR_RACA'].map({
-        0: 'Não declarada',
-        1: 'Branca', 
-        2: 'Preta', 
-        3: 'Parda', 
-        4: 'Amarela', 
-        5: 'Indígena'
-    })
+    df_censo['SEXO'] = decodificar(
+        df_censo['TP_SEXO'], ['Masculino', 'Feminino']
+    )
+    
+    df_censo['COR_RACA'] = decodificar(
+        df_censo['TP_COR_RACA'],
+        ['Não declarada', 'Branca', 'Preta', 'Parda', 'Amarela', 'Indígena'],
+        primeiro_codigo=0
+    )
     
     # Calcular distorção idade-série
-    def calcular_distorcao(row):
-        idade = row['NU_IDADE']
-        serie = row['TP_ETAPA_ENSINO']
-        
-        # Simplificação para demonstração
-        # Mapeando códigos para séries do ensino médio
-        if serie in [25, 26, 30, 31, 35, 36]:  # Códigos para 1ª série do EM
-            idade_esperada = 15
-        elif serie in [27, 28, 32, 37]:  # Códigos para 2ª série do EM
-            idade_esperada = 16
-        elif serie in [29, 33, 38]:  # Códigos para 3ª série do EM
-            idade_esperada = 17
-        else:
-            idade_esperada = 16  # Valor padrão para outros códigos
-        
-        return max(0, idade - idade_esperada)
+    # Tabela de idade esperada indexada pelo código da etapa (simplificação para demonstração);
+    # códigos não listados usam o valor padrão de 16 anos
+    IDADE_ESPERADA = np.full(128, 16, dtype=np.int16)
+    IDADE_ESPERADA[[25, 26, 30, 31, 35, 36]] = 15  # Códigos para 1ª série do EM
+    IDADE_ESPERADA[[27, 28, 32, 37]] = 16          # Códigos para 2ª série do EM
+    IDADE_ESPERADA[[29, 33, 38]] = 17              # Códigos para 3ª série do EM
     
-    df_censo['DISTORCAO_IDADE_SERIE'] = df_censo.apply(calcular_distorcao, axis=1)
+    idade = df_censo['NU_IDADE'].to_numpy(dtype=np.int16)
+    idade_esperada = IDADE_ESPERADA[df_censo['TP_ETAPA_ENSINO'].to_numpy()]
+    df_censo['DISTORCAO_IDADE_SERIE'] = np.maximum(0, idade - idade_esperada)
     
-    log_message("Variáveis do Censo Escolar padronizadas com sucesso")
+    logger.info("Variáveis do Censo Escolar padronizadas com sucesso")
 
 # 4.2 Padronizar variáveis em outras fontes...
 
@@ -136,83 +238,107 @@ if df_censo is not None:
 
 # 5.1 Agregar dados do Censo Escolar por escola
 if df_censo is not None:
-    log_message("Agregando dados do Censo Escolar por escola...")
-    
-    df_escola = df_censo.groupby('CO_ENTIDADE').agg({
-        'CO_MUNICIPIO': 'first',
-        'CO_UF': 'first',
-        'DEPENDENCIA': 'first',
-        'LOCALIZACAO': 'first',
-        'ABANDONO': 'mean',  # Taxa de abandono
-        'NU_ANO_CENSO': 'count'  # Total de alunos
-    }).reset_index()
-    
-    # Renomear colunas
-    df_escola = df_escola.rename(columns={
-        'ABANDONO': 'TAXA_ABANDONO',
-        'NU_ANO_CENSO': 'TOTAL_ALUNOS'
-    })
+    logger.info("Agregando dados do Censo Escolar por escola...")
     
-    # Converter taxa de abandono para percentual
-    df_escola['TAXA_ABANDONO'] = df_escola['TAXA_ABANDONO'] * 100
+    # Agregação apenas numérica por escola: abandonos (soma de 0/1) e total de alunos
+    agregado_escola = df_censo.groupby('CO_ENTIDADE', sort=False, observed=True).agg(
+        SOMA_ABANDONO=('ABANDONO', 'sum'),
+        TOTAL_ALUNOS=('ABANDONO', 'size')
+    )
+    
+    # Atributos constantes por escola: primeira ocorrência de cada CO_ENTIDADE
+    atributos_escola = df_censo[['CO_ENTIDADE', 'CO_MUNICIPIO', 'CO_UF', 'DEPENDENCIA', 'LOCALIZACAO']].drop_duplicates('CO_ENTIDADE')
+    
+    # Juntar atributos e agregados; taxa de abandono (%) como razão entre somas
+    df_escola = atributos_escola.merge(agregado_escola, left_on='CO_ENTIDADE', right_index=True)
+    df_escola.insert(5, 'TAXA_ABANDONO', df_escola.pop('SOMA_ABANDONO') * (100.0 / df_escola['TOTAL_ALUNOS']))
+    df_escola = df_escola.reset_index(drop=True)
+    
+    logger.info("Dados agregados para %d escolas", df_escola.shape[0])
+elif consulta_censo is not None:
+    logger.info("Agregando dados do Censo Escolar por escola (Polars)...")
+    
+    # Padronização, agregação e taxa em uma única consulta; o otimizador lê só as colunas
+    # usadas e paraleliza o group_by, materializando apenas o resultado por escola
+    df_escola = (
+        consulta_censo
+        .group_by('CO_ENTIDADE', maintain_order=True)
+        .agg(
+            pl.col('CO_MUNICIPIO', 'TP_DEPENDENCIA', 'TP_LOCALIZACAO').first(),
+            pl.col('CO_UF').first().cast(pl.Int8),
+            (pl.col('TP_SITUACAO') == 4).sum().alias('SOMA_ABANDONO'),
+            pl.len().alias('TOTAL_ALUNOS')
+        )
+        .with_columns(TAXA_ABANDONO=pl.col('SOMA_ABANDONO') * 100.0 / pl.col('TOTAL_ALUNOS'))
+        .collect()
+        .to_pandas()
+    )
+    
+    # Mesmas categorias da seção 4.1, agora sobre as escolas (já agregadas)
+    df_escola['DEPENDENCIA'] = decodificar(
+        df_escola.pop('TP_DEPENDENCIA'), ['Federal', 'Estadual', 'Municipal', 'Privada']
+    )
+    df_escola['LOCALIZACAO'] = decodificar(
+        df_escola.pop('TP_LOCALIZACAO'), ['Urbana', 'Rural']
+    )
+    df_escola = df_escola[['CO_ENTIDADE', 'CO_MUNICIPIO', 'CO_UF', 'DEPENDENCIA', 'LOCALIZACAO',
+                           'TAXA_ABANDONO', 'TOTAL_ALUNOS']]
     
-    log_message(f"Dados agregados para {df_escola.shape[0]} escolas")
+    logger.info("Dados agregados para %d escolas", df_escola.shape[0])
 
 # 5.2 Agregar dados do Censo Escolar por município
-if df_censo is not None:
-    log_message("Agregando dados do Censo Escolar por município...")
-    
-    df_municipio = df_censo.groupby('CO_MUNICIPIO').agg({
-        'CO_UF': 'first',
-        'ABANDONO': 'mean',  # Taxa de abandono
-        'NU_ANO_CENSO': 'count',  # Total de alunos
-        'CO_ENTIDADE': 'nunique'  # Número de escolas
-    }).reset_index()
-    
-    # Renomear colunas
-    df_municipio = df_municipio.rename(columns={
-        'ABANDONO': 'TAXA_ABANDONO',
-        'NU_ANO_CENSO': 'TOTAL_ALUNOS',
-        'CO_ENTIDADE': 'TOTAL_ESCOLAS'
-    })
+# Reagregação a partir das escolas (cada escola pertence a um único município), sem nova
+# passagem pela base de matrículas; a taxa ponderada é a razão entre somas
+if 'df_escola' in locals() and df_escola is not None:
+    logger.info("Agregando dados do Censo Escolar por município...")
     
-    # Converter taxa de abandono para percentual
-    df_municipio['TAXA_ABANDONO'] = df_municipio['TAXA_ABANDONO'] * 100
+    df_municipio = df_escola.assign(
+        _ABANDONOS=df_escola['TAXA_ABANDONO'] * df_escola['TOTAL_ALUNOS']
+    ).groupby('CO_MUNICIPIO', sort=False, observed=True).agg(
+        CO_UF=('CO_UF', 'first'),
+        _ABANDONOS=('_ABANDONOS', 'sum'),
+        TOTAL_ALUNOS=('TOTAL_ALUNOS', 'sum'),
+        TOTAL_ESCOLAS=('CO_ENTIDADE', 'size')
+    ).reset_index()
     
-    log_message(f"Dados agregados para {df_municipio.shape[0]} municípios")
+    # Taxa de abandono (%) ponderada pelo número de alunos de cada escola
+    df_municipio.insert(2, 'TAXA_ABANDONO', df_municipio.pop('_ABANDONOS') / df_municipio['TOTAL_ALUNOS'])
+    
+    logger.info("Dados agregados para %d municípios", df_municipio.shape[0])
 
 # 5.3 Integrar com dados socioeconômicos (simulados para demonstração)
-log_message("Gerando dados socioeconômicos simulados para integração...")
+logger.info("Gerando dados socioeconômicos simulados para integração...")
 
 if 'df_municipio' in locals() and df_municipio is not None:
-    # Criar dados socioeconômicos simulados
-    municipios_unicos = df_municipio['CO_MUNICIPIO'].unique()
-    n_municipios = len(municipios_unicos)
+    # Criar dados socioeconômicos simulados (uma linha por município, na ordem de df_municipio,
+    # que já tem CO_MUNICIPIO único após o groupby)
+    n_municipios = len(df_municipio)
+    
+    rng = np.random.default_rng(42)
+    
+    # Variáveis lognormal (PIB) e normal (IDEB) a partir de um único sorteio normal padrão
+    normais = rng.standard_normal((n_municipios, 2))
     
-    np.random.seed(42)
     dados_socioeconomicos = {
-        'CO_MUNICIPIO': municipios_unicos,
-        'PIB_PER_CAPITA': np.random.lognormal(10, 1, n_municipios),
-        'TAXA_DESEMPREGO': np.random.beta(2, 10, n_municipios) * 100,
-        'IDEB': np.random.normal(4.5, 1.2, n_municipios).clip(0, 10),
-        'TAXA_POBREZA': np.random.beta(2, 7, n_municipios) * 100,
-        'INDICE_GINI': np.random.beta(5, 15, n_municipios)
+        'PIB_PER_CAPITA': np.exp(10 + normais[:, 0]),
+        'TAXA_DESEMPREGO': rng.beta(2, 10, n_municipios) * 100,
+        'IDEB': np.clip(4.5 + 1.2 * normais[:, 1], 0, 10),
+        'TAXA_POBREZA': rng.beta(2, 7, n_municipios) * 100,
+        'INDICE_GINI': rng.beta(5, 15, n_municipios)
     }
     
     df_socioeconomico = pd.DataFrame(dados_socioeconomicos)
     
-    # Integrar com dados municipais
-    df_municipio_integrado = pd.merge(
-        df_municipio,
-        df_socioeconomico,
-        on='CO_MUNICIPIO',
-        how='left'
-    )
+    # Integrar com dados municipais: linhas já alinhadas por construção, basta concatenar as colunas
+    df_municipio_integrado = pd.concat([df_municipio, df_socioeconomico], axis=1)
     
-    log_message(f"Dados socioeconômicos integrados para {df_municipio_integrado.shape[0]} municípios")
+    logger.info("Dados socioeconômicos integrados para %d municípios", df_municipio_integrado.shape[0])
     
     # Salvar dados integrados
-    df_municipio_integrado.to_csv(os.path.join(PROCESSED_DIR, f"municipios_integrado_{ano_referencia}.csv"), index=False)
+    df_municipio_integrado.to_parquet(
+        os.path.join(PROCESSED_DIR, f"municipios_integrado_{ano_referencia}.parquet"),
+        engine='pyarrow', compression='zstd', index=False
+    )
 
 # 5.4 Integrar outras fontes...
 
@@ -220,130 +346,135 @@ if 'df_municipio' in locals() and df_municipio is not None:
 
 # 6.1 Verificar valores ausentes
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
-    log_message("Verificando valores ausentes nos dados integrados...")
+    logger.info("Verificando valores ausentes nos dados integrados...")
     
+    # Apenas as colunas com ausentes; sem ausentes, nenhum relatório é montado
     missing_counts = df_municipio_integrado.isnull().sum()
-    missing_percent = (missing_counts / len(df_municipio_integrado) * 100).round(2)
-    
-    missing_df = pd.DataFrame({
-        'Contagem': missing_counts,
-        'Percentual (%)': missing_percent
-    })
-    
-    print("\nValores ausentes por coluna:")
-    print(missing_df[missing_df['Contagem'] > 0])
+    missing_counts = missing_counts[missing_counts > 0]
     
     # Tratar valores ausentes
-    if missing_df['Contagem'].sum() > 0:
-        log_message("Tratando valores ausentes...")
+    if not missing_counts.empty:
+        print("\nValores ausentes por coluna:")
+        print(pd.DataFrame({
+            'Contagem': missing_counts,
+            'Percentual (%)': (missing_counts * (100 / len(df_municipio_integrado))).round(2)
+        }))
         
-        # Estratégia: preencher com a média para variáveis numéricas
-        numeric_cols = df_municipio_integrado.select_dtypes(include=['float64', 'int64']).columns
-        for col in numeric_cols:
-            if df_municipio_integrado[col].isnull().sum() > 0:
-                df_municipio_integrado[col] = df_municipio_integrado[col].fillna(df_municipio_integrado[col].mean())
+        logger.info("Tratando valores ausentes...")
         
-        log_message("Valores ausentes tratados")
+        # Estratégia: preencher com a média para variáveis numéricas (todas as colunas de uma vez)
+        numericas = df_municipio_integrado.select_dtypes(include=np.number)
+        df_municipio_integrado[numericas.columns] = numericas.fillna(numericas.mean())
+        
+        logger.info("Valores ausentes tratados")
+    
+    # Armazenamento Arrow para as etapas seguintes (reduções, clip e exportação via kernels Arrow)
+    df_municipio_integrado = df_municipio_integrado.convert_dtypes(dtype_backend='pyarrow')
 
 # 6.2 Verificar consistência dos dados
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
-    log_message("Verificando consistência dos dados integrados...")
+    logger.info("Verificando consistência dos dados integrados...")
     
-    # Verificar se há taxa de abandono fora do intervalo [0, 100]
-    taxa_invalida = ((df_municipio_integrado['TAXA_ABANDONO'] < 0) | 
-                    (df_municipio_integrado['TAXA_ABANDONO'] > 100)).sum()
+    # Taxas fora do intervalo [0, 100] e correlações esperadas em uma única passagem
+    # Cada coluna convertida diretamente em um array contíguo, sem montar um bloco 2D intermediário
+    abandono, pobreza, ideb = (
+        df_municipio_integrado[coluna].to_numpy(dtype=np.float64)
+        for coluna in ('TAXA_ABANDONO', 'TAXA_POBREZA', 'IDEB')
+    )
+    taxa_invalida, corr_taxa_pobreza, corr_ideb = estatisticas_qa(abandono, pobreza, ideb)
     
     if taxa_invalida > 0:
-        log_message(f"Encontradas {taxa_invalida} taxas de abandono inválidas. Corrigindo...", "WARNING")
-        df_municipio_integrado['TAXA_ABANDONO'] = df_municipio_integrado['TAXA_ABANDONO'].clip(0, 100)
+        logger.warning("Encontradas %d taxas de abandono inválidas. Corrigindo...", taxa_invalida)
+        # Reescreve apenas as linhas inválidas, reaproveitando o array já extraído para o QA
+        invalidas = (abandono < 0) | (abandono > 100)
+        df_municipio_integrado.loc[invalidas, 'TAXA_ABANDONO'] = np.clip(abandono[invalidas], 0, 100)
     
-    # Verificar correlações esperadas
-    corr_taxa_pobreza = df_municipio_integrado[['TAXA_ABANDONO', 'TAXA_POBREZA']].corr().iloc[0, 1]
-    corr_ideb = df_municipio_integrado[['TAXA_ABANDONO', 'IDEB']].corr().iloc[0, 1]
-    
-    log_message(f"Correlação entre taxa de abandono e pobreza: {corr_taxa_pobreza:.4f}")
-    log_message(f"Correlação entre taxa de abandono e IDEB: {corr_ideb:.4f}")
+    logger.info("Correlação entre taxa de abandono e pobreza: %.4f", corr_taxa_pobreza)
+    logger.info("Correlação entre taxa de abandono e IDEB: %.4f", corr_ideb)
     
     if corr_taxa_pobreza < 0 or corr_ideb > 0:
-        log_message("Correlações apresentam direção inesperada. Verificar dados.", "WARNING")
+        logger.warning("Correlações apresentam direção inesperada. Verificar dados.")
 
 ## 7. Criação de Features Adicionais
 
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
-    log_message("Criando features adicionais...")
+    logger.info("Criando features adicionais...")
     
     # Categorização da taxa de abandono
-    df_municipio_integrado['CATEGORIA_ABANDONO'] = pd.cut(
+    df_municipio_integrado['CATEGORIA_ABANDONO'] = categorizar(
         df_municipio_integrado['TAXA_ABANDONO'],
-        bins=[0, 5, 10, 15, 100],
-        labels=['Baixo (0-5%)', 'Médio (5-10%)', 'Alto (10-15%)', 'Muito Alto (>15%)']
+        limites=[0, 5, 10, 15, 100],
+        rotulos=['Baixo (0-5%)', 'Médio (5-10%)', 'Alto (10-15%)', 'Muito Alto (>15%)']
     )
     
-    # Categorização socioeconômica
-    df_municipio_integrado['NIVEL_POBREZA'] = pd.qcut(
-        df_municipio_integrado['TAXA_POBREZA'],
-        q=4,
-        labels=['Baixo', 'Médio-Baixo', 'Médio-Alto', 'Alto']
+    # Categorização socioeconômica (quartis, incluindo o valor mínimo na primeira faixa)
+    pobreza = df_municipio_integrado['TAXA_POBREZA'].to_numpy(dtype=np.float64)
+    df_municipio_integrado['NIVEL_POBREZA'] = categorizar(
+        pobreza,
+        limites=np.quantile(pobreza, [0, 0.25, 0.5, 0.75, 1]),
+        rotulos=['Baixo', 'Médio-Baixo', 'Médio-Alto', 'Alto'],
+        incluir_menor=True
     )
     
-    # Índice composto de vulnerabilidade
-    df_municipio_integrado['INDICE_VULNERABILIDADE'] = (
-        df_municipio_integrado['TAXA_POBREZA'] / 100 +
-        df_municipio_integrado['TAXA_DESEMPREGO'] / 100 +
-        df_municipio_integrado['INDICE_GINI'] -
-        df_municipio_integrado['IDEB'] / 10
+    # Índice composto de vulnerabilidade (expressão avaliada em uma única passagem)
+    df_municipio_integrado.eval(
+        'INDICE_VULNERABILIDADE = TAXA_POBREZA / 100 + TAXA_DESEMPREGO / 100 + INDICE_GINI - IDEB / 10',
+        inplace=True
     )
     
-    log_message("Features adicionais criadas com sucesso")
+    logger.info("Features adicionais criadas com sucesso")
 
 ## 8. Exportação dos Dados Integrados
 
 # 8.1 Exportar dados para análise exploratória
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
-    output_file = os.path.join(PROCESSED_DIR, f"dados_integrados_municipios_{ano_referencia}.csv")
-    df_municipio_integrado.to_csv(output_file, index=False)
-    log_message(f"Dados integrados por município exportados para: {output_file}")
+    output_file = os.path.join(PROCESSED_DIR, f"dados_integrados_municipios_{ano_referencia}.parquet")
+    df_municipio_integrado.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    logger.info("Dados integrados por município exportados para: %s", output_file)
 
 if 'df_escola' in locals() and df_escola is not None:
-    output_file = os.path.join(PROCESSED_DIR, f"dados_integrados_escolas_{ano_referencia}.csv")
-    df_escola.to_csv(output_file, index=False)
-    log_message(f"Dados integrados por escola exportados para: {output_file}")
+    output_file = os.path.join(PROCESSED_DIR, f"dados_integrados_escolas_{ano_referencia}.parquet")
+    df_escola.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    logger.info("Dados integrados por escola exportados para: %s", output_file)
 
 # 8.2 Exportar dicionário de dados
+# Descrição por nome de coluna (independe da ordem das colunas; colunas sem descrição ficam em branco)
+DESCRICAO_COLUNAS = {
+    'CO_MUNICIPIO': 'Código do município (IBGE)',
+    'CO_UF': 'Código da UF',
+    'TAXA_ABANDONO': 'Taxa de abandono escolar (%)',
+    'TOTAL_ALUNOS': 'Total de alunos no ensino médio',
+    'TOTAL_ESCOLAS': 'Total de escolas com ensino médio',
+    'PIB_PER_CAPITA': 'PIB per capita (R$)',
+    'TAXA_DESEMPREGO': 'Taxa de desemprego (%)',
+    'IDEB': 'Índice de Desenvolvimento da Educação Básica',
+    'TAXA_POBREZA': 'Taxa de pobreza (%)',
+    'INDICE_GINI': 'Índice de Gini (desigualdade)',
+    'CATEGORIA_ABANDONO': 'Categoria de abandono escolar',
+    'NIVEL_POBREZA': 'Nível de pobreza (quartis)',
+    'INDICE_VULNERABILIDADE': 'Índice composto de vulnerabilidade'
+}
+
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
     # Criar dicionário de dados
     dicionario = pd.DataFrame({
         'Variável': df_municipio_integrado.columns,
-        'Tipo': df_municipio_integrado.dtypes.astype(str),
-        'Descrição': [
-            'Código do município (IBGE)',
-            'Código da UF',
-            'Taxa de abandono escolar (%)',
-            'Total de alunos no ensino médio',
-            'Total de escolas com ensino médio',
-            'PIB per capita (R$)',
-            'Taxa de desemprego (%)',
-            'Índice de Desenvolvimento da Educação Básica',
-            'Taxa de pobreza (%)',
-            'Índice de Gini (desigualdade)',
-            'Categoria de abandono escolar',
-            'Nível de pobreza (quartis)',
-            'Índice composto de vulnerabilidade'
-        ]
+        'Tipo': df_municipio_integrado.dtypes.astype(str).to_numpy(),
+        'Descrição': [DESCRICAO_COLUNAS.get(coluna, '') for coluna in df_municipio_integrado.columns]
     })
     
     output_file = os.path.join(PROCESSED_DIR, "dicionario_dados_integrados.csv")
     dicionario.to_csv(output_file, index=False)
-    log_message(f"Dicionário de dados exportado para: {output_file}")
+    logger.info("Dicionário de dados exportado para: %s", output_file)
 
 ## 9. Resumo e Próximos Passos
 
-log_message("=== Resumo da Integração de Dados ===")
+logger.info("=== Resumo da Integração de Dados ===")
 if 'df_municipio_integrado' in locals() and df_municipio_integrado is not None:
-    log_message(f"Dados integrados para {df_municipio_integrado.shape[0]} municípios")
-    log_message(f"Total de variáveis disponíveis: {df_municipio_integrado.shape[1]}")
-    log_message(f"Taxa média de abandono: {df_municipio_integrado['TAXA_ABANDONO'].mean():.2f}%")
-    log_message(f"Distribuição por categoria de abandono:")
+    logger.info("Dados integrados para %d municípios", df_municipio_integrado.shape[0])
+    logger.info("Total de variáveis disponíveis: %d", df_municipio_integrado.shape[1])
+    logger.info("Taxa média de abandono: %.2f%%", df_municipio_integrado['TAXA_ABANDONO'].mean())
+    logger.info("Distribuição por categoria de abandono:")
     print(df_municipio_integrado['CATEGORIA_ABANDONO'].value_counts(normalize=True).mul(100).round(1))
 
-log_message("Próximos passos: Análise Exploratória de Dados no notebook 3_analise_exploratoria.ipynb")
+logger.info("Próximos passos: Análise Exploratória de Dados no notebook 3_analise_exploratoria.ipynb")
@@ -8,12 +8,23 @@ potencialmente associados.
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Backend não interativo: apenas geração de arquivos
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats
 import os
 import logging
+import hashlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Numba é opcional: acelera o cálculo do tau de Kendall para todos os pares de colunas
+try:
+    from numba import njit
+    NUMBA_DISPONIVEL = True
+except ImportError:
+    NUMBA_DISPONIVEL = False
 
 # Configurar logging
 logging.basicConfig(
@@ -33,12 +44,61 @@ DATA_DIR = BASE_DIR / 'data'
 PROCESSED_DIR = DATA_DIR / 'processed'
 RESULTS_DIR = DATA_DIR / 'results'
 PLOTS_DIR = BASE_DIR / 'visualizacoes' / 'graficos'
+CACHE_DIR = RESULTS_DIR / 'cache'
 
 # Criar diretórios se não existirem
-for directory in [DATA_DIR, PROCESSED_DIR, RESULTS_DIR, PLOTS_DIR]:
+for directory in [DATA_DIR, PROCESSED_DIR, RESULTS_DIR, PLOTS_DIR, CACHE_DIR]:
     if not directory.exists():
         directory.mkdir(parents=True)
 
+# Resolução dos gráficos (300 para versões de impressão)
+DPI_GRAFICOS = int(os.environ.get('DPI_GRAFICOS', 120))
+
+# Acima deste número de variáveis, o mapa de calor não escreve os valores em cada célula
+MAX_VARIAVEIS_ANOTADAS = 30
+
+
+def salvar_tabela(df, arquivo, index=False):
+    """
+    Salva uma tabela de resultados em Parquet (zstd) e, para inspeção manual, em CSV
+    
+    Args:
+        df (pandas.DataFrame): Tabela a ser salva
+        arquivo (Path): Caminho do arquivo, sem extensão
+        index (bool): Se True, grava também o índice
+    
+    Returns:
+        Path: Caminho do arquivo Parquet gerado
+    """
+    arquivo_parquet = arquivo.with_suffix('.parquet')
+    df.to_parquet(arquivo_parquet, engine='pyarrow', compression='zstd', index=index)
+    df.to_csv(arquivo.with_suffix('.csv'), index=index)
+    return arquivo_parquet
+
+
+def ler_dados_integrados(nome_base):
+    """
+    Lê uma base integrada, preferindo o arquivo Parquet à versão CSV
+    
+    Args:
+        nome_base (str): Nome do arquivo em PROCESSED_DIR, sem extensão
+    
+    Returns:
+        pandas.DataFrame: Dados lidos, ou None se nenhum dos arquivos existir
+    """
+    arquivo_parquet = PROCESSED_DIR / f"{nome_base}.parquet"
+    if arquivo_parquet.exists():
+        return pd.read_parquet(arquivo_parquet, engine='pyarrow')
+    
+    # CSV legado: leitor multithread do PyArrow
+    arquivo_csv = PROCESSED_DIR / f"{nome_base}.csv"
+    if arquivo_csv.exists():
+        logger.info(f"Lendo {arquivo_csv}; converta para Parquet para um carregamento mais rápido")
+        return pd.read_csv(arquivo_csv, engine='pyarrow')
+    
+    logger.warning(f"Arquivo {arquivo_parquet} não encontrado")
+    return None
+
 
 def carregar_dados(ano_referencia):
     """
@@ -53,84 +113,380 @@ def carregar_dados(ano_referencia):
     dados = {}
     
     # Carregar dados por município
-    arquivo_municipios = PROCESSED_DIR / f"dados_integrados_municipios_{ano_referencia}.csv"
-    if arquivo_municipios.exists():
-        dados['municipios'] = pd.read_csv(arquivo_municipios)
+    df_municipios = ler_dados_integrados(f"dados_integrados_municipios_{ano_referencia}")
+    if df_municipios is not None:
+        dados['municipios'] = df_municipios
         logger.info(f"Dados de {len(dados['municipios'])} municípios carregados")
-    else:
-        logger.warning(f"Arquivo {arquivo_municipios} não encontrado")
     
     # Carregar dados por escola
-    arquivo_escolas = PROCESSED_DIR / f"dados_integrados_escolas_{ano_referencia}.csv"
-    if arquivo_escolas.exists():
-        dados['escolas'] = pd.read_csv(arquivo_escolas)
+    df_escolas = ler_dados_integrados(f"dados_integrados_escolas_{ano_referencia}")
+    if df_escolas is not None:
+        dados['escolas'] = df_escolas
         logger.info(f"Dados de {len(dados['escolas'])} escolas carregados")
-    else:
-        logger.warning(f"Arquivo {arquivo_escolas} não encontrado")
     
     return dados
 
 
-def calcular_matriz_correlacao(df, metodo='pearson', target_var='TAXA_ABANDONO'):
+def extrair_variaveis_numericas(df):
     """
-    Calcula matriz de correlação entre variáveis
+    Extrai uma única vez as variáveis numéricas (não constantes) como matriz float64
     
     Args:
         df (pandas.DataFrame): DataFrame com os dados
+    
+    Returns:
+        tuple: (matriz numpy linhas x colunas, índice com os nomes das colunas)
+    """
+    colunas = df.select_dtypes(include=[np.number]).columns
+    X = np.ascontiguousarray(df[colunas].to_numpy(dtype=np.float64, na_value=np.nan))
+    
+    # Colunas constantes gerariam linhas/colunas inteiras de NaN na matriz de correlação
+    with np.errstate(invalid='ignore'):
+        manter = np.nanstd(X, axis=0) > 1e-12
+    if not manter.all():
+        logger.warning(f"Colunas constantes ignoradas na correlação: {colunas[~manter].tolist()}")
+        X, colunas = np.ascontiguousarray(X[:, manter]), colunas[manter]
+    
+    return X, colunas
+
+
+def chave_cache_correlacao(X, colunas):
+    """
+    Calcula uma chave de conteúdo para os dados de entrada das correlações
+    
+    Args:
+        X (numpy.ndarray): Matriz das variáveis numéricas (contígua)
+        colunas (pandas.Index): Nomes das colunas de X
+    
+    Returns:
+        str: Resumo BLAKE2b (hexadecimal) dos valores e dos nomes das colunas
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    resumo.update(X)
+    resumo.update(f"{X.shape}|{'|'.join(map(str, colunas))}".encode('utf-8'))
+    return resumo.hexdigest()
+
+
+def limpar_cache_correlacao(nivel, ano_referencia, metodo, chave):
+    """
+    Remove do cache as matrizes de execuções anteriores (chaves de dados já superados)
+    para o mesmo nível, ano e método
+    
+    Args:
+        nivel (str): Nível de agregação
+        ano_referencia (int): Ano de referência
+        metodo (str): Método de correlação
+        chave (str): Chave dos dados atuais, cujos arquivos são mantidos
+    
+    Returns:
+        int: Número de arquivos removidos
+    """
+    removidos = 0
+    for prefixo in ('correlacao', 'p_values'):
+        for arquivo in CACHE_DIR.glob(f"{prefixo}_{nivel}_{ano_referencia}_{metodo}_*.parquet"):
+            if arquivo.stem.rsplit('_', 1)[-1] != chave:
+                arquivo.unlink(missing_ok=True)
+                removidos += 1
+    return removidos
+
+
+def correlacao_pares_completos(X, validos):
+    """
+    Calcula correlações de Pearson usando, em cada par de colunas, apenas as linhas
+    completas nas duas colunas
+    
+    Args:
+        X (numpy.ndarray): Matriz de dados (linhas x colunas), com NaN nos ausentes
+        validos (numpy.ndarray): Máscara booleana de valores não ausentes em X
+    
+    Returns:
+        tuple: (matriz de correlação, matriz com o número de observações de cada par)
+    """
+    m = validos.astype(np.float64)
+    
+    # Centralizar pela média de cada coluna reduz o cancelamento numérico nas somas
+    x0 = np.where(validos, X - np.nanmean(X, axis=0), 0.0)
+    
+    # Somas restritas às linhas completas de cada par (i, j): três produtos matriciais
+    n = m.T @ m
+    soma = x0.T @ m
+    soma_quad = (x0 * x0).T @ m
+    soma_prod = x0.T @ x0
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = soma / n
+        cov = soma_prod / n - media * media.T
+        var = soma_quad / n - media * media
+        r = cov / np.sqrt(var * var.T)
+    
+    return np.clip(r, -1.0, 1.0), n
+
+
+if NUMBA_DISPONIVEL:
+    @njit(cache=True)
+    def _ordenar_contando_inversoes(v):
+        """Merge sort de v, contando os pares em ordem estritamente decrescente"""
+        n = v.shape[0]
+        aux = np.empty_like(v)
+        inversoes = 0
+        largura = 1
+        while largura < n:
+            for inicio in range(0, n, 2 * largura):
+                meio = min(inicio + largura, n)
+                fim = min(inicio + 2 * largura, n)
+                i, j, k = inicio, meio, inicio
+                while i < meio and j < fim:
+                    if v[j] < v[i]:
+                        aux[k] = v[j]
+                        inversoes += meio - i
+                        j += 1
+                    else:
+                        aux[k] = v[i]
+                        i += 1
+                    k += 1
+                while i < meio:
+                    aux[k] = v[i]
+                    i += 1
+                    k += 1
+                while j < fim:
+                    aux[k] = v[j]
+                    j += 1
+                    k += 1
+            v, aux = aux, v
+            largura *= 2
+        return v, inversoes
+    
+    @njit(cache=True)
+    def _pares_empatados(x, y):
+        """Pares empatados em x (e também em y, se y for informado) em vetores já ordenados"""
+        total = 0
+        t = 1
+        for i in range(1, x.shape[0]):
+            if x[i] == x[i - 1] and y[i] == y[i - 1]:
+                t += 1
+            else:
+                total += t * (t - 1) // 2
+                t = 1
+        return total + t * (t - 1) // 2
+    
+    @njit(cache=True)
+    def _kendall_tau_b(x, y):
+        """Tau-b de Kendall em O(n log n) pelo algoritmo de Knight"""
+        n = x.shape[0]
+        ordem = np.argsort(y, kind='mergesort')
+        ordem = ordem[np.argsort(x[ordem], kind='mergesort')]
+        xs = x[ordem]
+        ys = y[ordem]
+        
+        empates_x = _pares_empatados(xs, np.zeros(n))
+        empates_xy = _pares_empatados(xs, ys)
+        ys, discordantes = _ordenar_contando_inversoes(ys)
+        empates_y = _pares_empatados(ys, np.zeros(n))
+        
+        total = n * (n - 1) // 2
+        denominador = np.sqrt(float(total - empates_x) * float(total - empates_y))
+        if denominador == 0.0:
+            return np.nan
+        return (total - empates_x - empates_y + empates_xy - 2 * discordantes) / denominador
+    
+    # Serial de propósito: o pool de threads do numba (parallel=True) trava os processos
+    # criados por fork nos ProcessPoolExecutor dos gráficos e da ANOVA; com poucas dezenas
+    # de colunas, o laço serial em O(n log n) por par já é rápido
+    @njit(cache=True)
+    def _kendall_pares(X):
+        k = X.shape[1]
+        saida = np.empty((k, k))
+        for i in range(k):
+            saida[i, i] = 1.0
+            for j in range(i + 1, k):
+                tau = _kendall_tau_b(X[:, i], X[:, j])
+                saida[i, j] = tau
+                saida[j, i] = tau
+        return saida
+
+
+def calcular_correlacoes(X, colunas, metodo='pearson'):
+    """
+    Calcula a matriz de correlação como array numpy
+    
+    Args:
+        X (numpy.ndarray): Matriz das variáveis numéricas (ver extrair_variaveis_numericas)
+        colunas (pandas.Index): Nomes das colunas de X
+        metodo (str): Método de correlação ('pearson', 'spearman', 'kendall')
+    
+    Returns:
+        numpy.ndarray: Matriz de correlação (colunas x colunas)
+    """
+    validos = ~np.isnan(X)
+    
+    if metodo in ('pearson', 'spearman') and validos.all():
+        # Sem valores ausentes: uma única chamada BLAS (Spearman = Pearson dos postos)
+        if metodo == 'spearman':
+            X = stats.rankdata(X, axis=0)
+        return np.corrcoef(X, rowvar=False)
+    
+    if metodo == 'pearson':
+        # Com valores ausentes: cada par usa apenas as linhas completas nas duas colunas
+        return correlacao_pares_completos(X, validos)[0]
+    
+    if metodo == 'kendall' and NUMBA_DISPONIVEL and validos.all():
+        # Ordem Fortran deixa cada coluna contígua
+        return _kendall_pares(np.asfortranarray(X))
+    
+    # Kendall, ou Spearman com ausentes (postos por par de colunas): feito pelo pandas
+    return pd.DataFrame(X, columns=colunas, copy=False).corr(method=metodo).to_numpy()
+
+
+def calcular_matriz_correlacao(X, colunas, metodo='pearson', target_var='TAXA_ABANDONO'):
+    """
+    Calcula matriz de correlação entre variáveis
+    
+    Args:
+        X (numpy.ndarray): Matriz das variáveis numéricas (ver extrair_variaveis_numericas)
+        colunas (pandas.Index): Nomes das colunas de X
         metodo (str): Método de correlação ('pearson', 'spearman', 'kendall')
         target_var (str): Variável alvo para análise
     
     Returns:
         pandas.DataFrame: Matriz de correlação
     """
-    # Selecionar apenas variáveis numéricas
-    df_num = df.select_dtypes(include=['int64', 'float64'])
-    
-    # Verificar se variável alvo está no DataFrame
-    if target_var not in df_num.columns:
+    # Verificar se variável alvo está entre as variáveis numéricas
+    if target_var not in colunas:
         logger.warning(f"Variável alvo {target_var} não encontrada no DataFrame")
         return None
     
     # Calcular matriz de correlação
-    corr_matrix = df_num.corr(method=metodo)
+    corr_matrix = pd.DataFrame(calcular_correlacoes(X, colunas, metodo), index=colunas, columns=colunas)
     
     logger.info(f"Matriz de correlação calculada usando método {metodo}")
     return corr_matrix
 
 
-def calcular_p_values(df, metodo='pearson'):
+def estatisticas_empates(X):
+    """
+    Calcula, para cada coluna, as somas de empates usadas na variância do tau-b de Kendall
+    
+    Args:
+        X (numpy.ndarray): Matriz de dados sem valores ausentes
+    
+    Returns:
+        numpy.ndarray: Matriz 3 x colunas com Σt(t-1), Σt(t-1)(2t+5) e Σt(t-1)(t-2), onde t
+        é o tamanho de cada grupo de valores empatados
+    """
+    empates = np.zeros((3, X.shape[1]))
+    for j in range(X.shape[1]):
+        t = np.unique(X[:, j], return_counts=True)[1].astype(np.float64)
+        empates[0, j] = (t * (t - 1)).sum()
+        empates[1, j] = (t * (t - 1) * (2 * t + 5)).sum()
+        empates[2, j] = (t * (t - 1) * (t - 2)).sum()
+    return empates
+
+
+def p_values_kendall(X, tau):
+    """
+    Calcula p-values do tau-b de Kendall pela aproximação normal com correção de empates
+    (a mesma variância de S usada por scipy.stats.kendalltau)
+    
+    Args:
+        X (numpy.ndarray): Matriz das variáveis numéricas
+        tau (numpy.ndarray): Matriz de correlação tau-b de X
+    
+    Returns:
+        numpy.ndarray: Matriz de p-values
+    """
+    if np.isnan(X).any():
+        # Com ausentes, os empates dependem das linhas completas de cada par: scipy por par
+        k = X.shape[1]
+        p = np.ones((k, k))
+        for i in range(k):
+            for j in range(i + 1, k):
+                completos = ~(np.isnan(X[:, i]) | np.isnan(X[:, j]))
+                p[i, j] = p[j, i] = stats.kendalltau(X[completos, i], X[completos, j]).pvalue
+        return p
+    
+    n = X.shape[0]
+    pares = n * (n - 1.0)
+    e0, e1, e2 = estatisticas_empates(X)
+    
+    # S = concordantes - discordantes, recuperado do tau-b e dos pares não empatados
+    nao_empatados = pares / 2 - e0 / 2
+    s = tau * np.sqrt(np.outer(nao_empatados, nao_empatados))
+    
+    var_s = (
+        (pares * (2 * n + 5) - e1[:, None] - e1[None, :]) / 18
+        + np.outer(e0, e0) / (2 * pares)
+        + np.outer(e2, e2) / (9 * pares * (n - 2))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = s / np.sqrt(var_s)
+    return 2 * stats.norm.sf(np.abs(z))
+
+
+def calcular_p_values(X, colunas, metodo='pearson', corr_matrix=None):
     """
     Calcula p-values para correlações
     
     Args:
-        df (pandas.DataFrame): DataFrame com dados
-        metodo (str): Método de correlação ('pearson', 'spearman')
+        X (numpy.ndarray): Matriz das variáveis numéricas (ver extrair_variaveis_numericas)
+        colunas (pandas.Index): Nomes das colunas de X
+        metodo (str): Método de correlação ('pearson', 'spearman', 'kendall')
+        corr_matrix (pandas.DataFrame, optional): Matriz de correlação já calculada com o
+            mesmo método, reaproveitada em vez de recalculada
     
     Returns:
         pandas.DataFrame: Matriz de p-values
     """
-    # Selecionar apenas variáveis numéricas
-    df_num = df.select_dtypes(include=['int64', 'float64'])
+    if metodo not in ('pearson', 'spearman', 'kendall'):
+        raise ValueError(f"Método {metodo} não suportado para cálculo de p-values")
     
-    # Inicializar matriz de p-values
-    p_values = pd.DataFrame(index=df_num.columns, columns=df_num.columns)
+    if corr_matrix is not None:
+        r = corr_matrix.to_numpy(dtype=np.float64)
+    else:
+        r = calcular_correlacoes(X, colunas, metodo)
     
-    # Calcular p-values para cada par de variáveis
-    for i in df_num.columns:
-        for j in df_num.columns:
-            if metodo == 'pearson':
-                corr, p = stats.pearsonr(df_num[i].dropna(), df_num[j].dropna())
-            elif metodo == 'spearman':
-                corr, p = stats.spearmanr(df_num[i].dropna(), df_num[j].dropna())
-            else:
-                raise ValueError(f"Método {metodo} não suportado para cálculo de p-values")
-            
-            p_values.loc[i, j] = p
+    if metodo == 'kendall':
+        p = p_values_kendall(X, r)
+    else:
+        # Número de observações completas em cada par de colunas
+        m = (~np.isnan(X)).astype(np.float64)
+        n = m.T @ m
+        
+        # Teste t do coeficiente de correlação, com n - 2 graus de liberdade (como pearsonr/spearmanr)
+        dof = n - 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_stat = r * np.sqrt(dof / np.clip(1 - r * r, 1e-30, None))
+        p = 2 * stats.t.sf(np.abs(t_stat), dof)
+    np.fill_diagonal(p, 0.0)
+    
+    p_values = pd.DataFrame(p, index=colunas, columns=colunas)
     
     logger.info(f"P-values calculados usando método {metodo}")
     return p_values
 
 
+def correlacoes_em_pares(corr_matrix, p_values):
+    """
+    Converte as matrizes (simétricas) de correlação e p-values para o formato longo,
+    com uma linha por par de variáveis distintas
+    
+    Args:
+        corr_matrix (pandas.DataFrame): Matriz de correlação
+        p_values (pandas.DataFrame): Matriz de p-values com as mesmas linhas e colunas
+    
+    Returns:
+        pandas.DataFrame: Pares (triângulo superior, sem a diagonal) com correlação e p-valor
+    """
+    colunas = corr_matrix.columns.to_numpy()
+    linhas, cols = np.triu_indices(len(colunas), k=1)
+    
+    return pd.DataFrame({
+        'Variável 1': colunas[linhas],
+        'Variável 2': colunas[cols],
+        'Correlação': corr_matrix.to_numpy(dtype=np.float64)[linhas, cols],
+        'P-valor': p_values.to_numpy(dtype=np.float64)[linhas, cols]
+    })
+
+
 def visualizar_mapa_correlacao(corr_matrix, output_path):
     """
     Cria e salva mapa de calor da matriz de correlação
@@ -147,13 +503,19 @@ def visualizar_mapa_correlacao(corr_matrix, output_path):
         mask = np.triu(np.ones_like(corr_matrix))
         cmap = sns.diverging_palette(230, 20, as_cmap=True)
         
+        # Rótulos das células formatados de uma vez (vetorizado), em vez de célula a célula
+        if corr_matrix.shape[0] <= MAX_VARIAVEIS_ANOTADAS:
+            rotulos = np.char.mod('%.2f', corr_matrix.to_numpy(dtype=np.float64))
+        else:
+            rotulos = False
+        
         sns.heatmap(corr_matrix, mask=mask, cmap=cmap, vmax=1, vmin=-1, center=0,
-                    annot=True, fmt='.2f', square=True, linewidths=.5)
+                    annot=rotulos, fmt='', square=True, linewidths=.5)
         
         plt.title('Matriz de Correlação entre Variáveis', fontsize=16)
         plt.tight_layout()
         
-        plt.savefig(output_path, bbox_inches='tight', dpi=300)
+        plt.savefig(output_path, bbox_inches='tight', dpi=DPI_GRAFICOS)
         plt.close()
         
         logger.info(f"Mapa de correlação salvo em {output_path}")
@@ -208,21 +570,19 @@ def visualizar_correlacoes_target(corr_matrix, target_var, p_values=None, p_thre
         
         # Adicionar marcadores de significância
         if p_values is not None:
-            for i, var in enumerate(correlacoes_sig.index):
-                p_val = p_values.loc[var, target_var]
-                if p_val < 0.001:
-                    plt.text(correlacoes_sig[var] + 0.02 * np.sign(correlacoes_sig[var]), i, '***', 
-                           ha='left' if correlacoes_sig[var] >= 0 else 'right', va='center')
-                elif p_val < 0.01:
-                    plt.text(correlacoes_sig[var] + 0.02 * np.sign(correlacoes_sig[var]), i, '**', 
-                           ha='left' if correlacoes_sig[var] >= 0 else 'right', va='center')
-                elif p_val < 0.05:
-                    plt.text(correlacoes_sig[var] + 0.02 * np.sign(correlacoes_sig[var]), i, '*', 
-                           ha='left' if correlacoes_sig[var] >= 0 else 'right', va='center')
+            # Rótulos, posições e alinhamentos calculados de uma vez para todas as barras
+            valores = correlacoes_sig.to_numpy(dtype=np.float64)
+            p_vals = p_values[target_var].reindex(correlacoes_sig.index).to_numpy(dtype=np.float64)
+            rotulos = np.select([p_vals < 0.001, p_vals < 0.01, p_vals < 0.05], ['***', '**', '*'], default='')
+            posicoes = valores + 0.02 * np.sign(valores)
+            alinhamentos = np.where(valores >= 0, 'left', 'right')
+            
+            for i in np.flatnonzero(rotulos != ''):
+                plt.text(posicoes[i], i, rotulos[i], ha=alinhamentos[i], va='center')
         
         if output_path:
             plt.tight_layout()
-            plt.savefig(output_path, bbox_inches='tight', dpi=300)
+            plt.savefig(output_path, bbox_inches='tight', dpi=DPI_GRAFICOS)
             plt.close()
             logger.info(f"Gráfico de correlações com {target_var} salvo em {output_path}")
         
@@ -232,7 +592,50 @@ def visualizar_correlacoes_target(corr_matrix, target_var, p_values=None, p_thre
         return None
 
 
-def gerar_scatterplots(df, target_var, top_vars, output_dir):
+def renderizar_scatterplot(var, target_var, pares, corr_valor, output_path):
+    """
+    Renderiza e salva um gráfico de dispersão (executado em processo separado)
+    
+    Args:
+        var (str): Variável do eixo x
+        target_var (str): Variável alvo (eixo y)
+        pares (numpy.ndarray): Matriz n x 2 com os pares completos (var, target_var)
+        corr_valor (float): Correlação a ser anotada no gráfico
+        output_path (Path): Caminho para salvar a visualização
+    
+    Returns:
+        bool: True se o gráfico foi salvo com sucesso
+    """
+    try:
+        # Reta de mínimos quadrados (sem o intervalo por bootstrap do regplot)
+        xv, yv = pares.T
+        inclinacao, intercepto = np.polyfit(xv, yv, 1)
+        extremos = np.array([xv.min(), xv.max()])
+        
+        plt.figure(figsize=(10, 8))
+        plt.scatter(xv, yv, alpha=0.5, rasterized=True)
+        plt.plot(extremos, inclinacao * extremos + intercepto, color='red')
+        
+        plt.title(f'Relação entre {var} e {target_var}', fontsize=16)
+        plt.xlabel(var, fontsize=14)
+        plt.ylabel(target_var, fontsize=14)
+        plt.grid(True, alpha=0.3)
+        
+        plt.annotate(f'Correlação: {corr_valor:.4f}', 
+                   xy=(0.05, 0.95), xycoords='axes fraction',
+                   bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
+        
+        # Salvar o gráfico
+        plt.savefig(output_path, bbox_inches='tight', dpi=DPI_GRAFICOS)
+        plt.close()
+        
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao criar gráfico de dispersão para {var}: {str(e)}")
+        return False
+
+
+def gerar_scatterplots(df, target_var, top_vars, output_dir, correlacoes):
     """
     Gera gráficos de dispersão entre variável alvo e principais correlacionadas
     
@@ -241,42 +644,92 @@ def gerar_scatterplots(df, target_var, top_vars, output_dir):
         target_var (str): Variável alvo para análise
         top_vars (list): Lista das variáveis mais correlacionadas
         output_dir (Path): Diretório para salvar as visualizações
+        correlacoes (pandas.Series): Correlações com a variável alvo, indexadas pela variável
     
     Returns:
         int: Número de gráficos gerados com sucesso
     """
-    count = 0
+    # Cada processo recebe apenas os pares completos das duas colunas do seu gráfico
+    pares = [df[[var, target_var]].dropna().to_numpy(dtype=np.float64) for var in top_vars]
+    caminhos = [output_dir / f'scatter_{var}_{target_var}.png' for var in top_vars]
     
-    for var in top_vars:
-        try:
-            plt.figure(figsize=(10, 8))
-            sns.regplot(x=var, y=target_var, data=df, 
-                      scatter_kws={'alpha':0.5}, line_kws={'color':'red'})
-            
-            plt.title(f'Relação entre {var} e {target_var}', fontsize=16)
-            plt.xlabel(var, fontsize=14)
-            plt.ylabel(target_var, fontsize=14)
-            plt.grid(True, alpha=0.3)
-            
-            # Calcular e mostrar correlação
-            corr_valor = np.corrcoef(df[var].dropna(), df[target_var].dropna())[0, 1]
-            plt.annotate(f'Correlação: {corr_valor:.4f}', 
-                       xy=(0.05, 0.95), xycoords='axes fraction',
-                       bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
-            
-            # Salvar o gráfico
-            output_path = output_dir / f'scatter_{var}_{target_var}.png'
-            plt.savefig(output_path, bbox_inches='tight', dpi=300)
-            plt.close()
-            
-            count += 1
-        except Exception as e:
-            logger.error(f"Erro ao criar gráfico de dispersão para {var}: {str(e)}")
+    with ProcessPoolExecutor(max_workers=max(1, min(len(top_vars), os.cpu_count() or 1))) as executor:
+        count = sum(executor.map(
+            renderizar_scatterplot,
+            top_vars, [target_var] * len(top_vars), pares, correlacoes[top_vars].tolist(), caminhos
+        ))
     
     logger.info(f"Gerados {count} gráficos de dispersão")
     return count
 
 
+def analisar_variavel_categorica(dados, var, target_var, output_path):
+    """
+    Realiza a ANOVA de uma variável categórica e salva o boxplot (executado em processo separado)
+    
+    Args:
+        dados (pandas.DataFrame): Apenas as colunas var e target_var
+        var (str): Variável categórica
+        target_var (str): Variável alvo numérica
+        output_path (Path): Caminho para salvar o boxplot
+    
+    Returns:
+        dict: Resultado do teste, ou None se houver menos de dois grupos ou ocorrer erro
+    """
+    try:
+        # Estatísticas por grupo (uma passagem; fornecem as somas de quadrados da ANOVA),
+        # sem ordenar as chaves nem expandir categorias sem observações
+        stats_grupo = dados.groupby(var, sort=False, observed=True)[target_var].agg(
+            ['mean', 'var', 'count']
+        ).reset_index()
+        
+        # Verificar se há mais de um grupo
+        if len(stats_grupo) <= 1:
+            return None
+        
+        # Realizar ANOVA a partir das médias, variâncias e contagens dos grupos não vazios
+        grupos_validos = stats_grupo[stats_grupo['count'] > 0]
+        contagens = grupos_validos['count'].to_numpy(dtype=np.float64)
+        medias = grupos_validos['mean'].to_numpy(dtype=np.float64)
+        variancias = np.nan_to_num(grupos_validos['var'].to_numpy(dtype=np.float64))
+        
+        if len(grupos_validos) < 2:
+            return None
+        
+        g, n = len(grupos_validos), contagens.sum()
+        media_geral = np.average(medias, weights=contagens)
+        soma_quad_entre = (contagens * (medias - media_geral) ** 2).sum()
+        soma_quad_dentro = ((contagens - 1) * variancias).sum()
+        f_val = (soma_quad_entre / (g - 1)) / (soma_quad_dentro / (n - g))
+        p_val = stats.f.sf(f_val, g - 1, n - g)
+        
+        # Criar visualização
+        fig, ax = plt.subplots(figsize=(12, 8))
+        sns.boxplot(x=var, y=target_var, data=dados, ax=ax)
+        ax.set_title(f'{target_var} por {var}', fontsize=16)
+        ax.set_xlabel(var, fontsize=14)
+        ax.set_ylabel(target_var, fontsize=14)
+        ax.grid(True, alpha=0.3, axis='y')
+        ax.annotate(f'ANOVA: p = {p_val:.4f}', 
+                   xy=(0.5, 0.01), xycoords='axes fraction',
+                   ha='center', va='bottom',
+                   fontsize=10)
+        
+        fig.savefig(output_path, bbox_inches='tight', dpi=DPI_GRAFICOS)
+        plt.close(fig)
+        
+        return {
+            'Variável': var,
+            'Teste': 'ANOVA',
+            'Estatística': f_val,
+            'P-valor': p_val,
+            'Significativo': p_val < 0.05
+        }
+    except Exception as e:
+        logger.error(f"Erro ao analisar variável categórica {var}: {str(e)}")
+        return None
+
+
 def analisar_correlacoes_categoricas(df, cat_vars, target_var, output_dir):
     """
     Analisa relações entre variáveis categóricas e a variável alvo
@@ -290,54 +743,22 @@ def analisar_correlacoes_categoricas(df, cat_vars, target_var, output_dir):
     Returns:
         pandas.DataFrame: Resultados dos testes estatísticos
     """
-    resultados = []
-    count = 0
-    
-    for var in cat_vars:
-        if var in df.columns:
-            try:
-                # Estatísticas por grupo
-                stats_grupo = df.groupby(var)[target_var].agg(['mean', 'median', 'std', 'count']).reset_index()
-                
-                # Verificar se há mais de um grupo
-                if len(stats_grupo) > 1:
-                    # Realizar ANOVA
-                    grupos = [df[df[var] == cat][target_var].dropna() for cat in df[var].unique()]
-                    grupos_validos = [g for g in grupos if len(g) > 0]
-                    
-                    if len(grupos_validos) >= 2:
-                        f_val, p_val = stats.f_oneway(*grupos_validos)
-                        
-                        # Criar visualização
-                        plt.figure(figsize=(12, 8))
-                        sns.boxplot(x=var, y=target_var, data=df)
-                        plt.title(f'{target_var} por {var}', fontsize=16)
-                        plt.xlabel(var, fontsize=14)
-                        plt.ylabel(target_var, fontsize=14)
-                        plt.grid(True, alpha=0.3, axis='y')
-                        plt.annotate(f'ANOVA: p = {p_val:.4f}', 
-                                   xy=(0.5, 0.01), xycoords='axes fraction',
-                                   ha='center', va='bottom',
-                                   fontsize=10)
-                        
-                        output_path = output_dir / f'boxplot_{var}_{target_var}.png'
-                        plt.savefig(output_path, bbox_inches='tight', dpi=300)
-                        plt.close()
-                        
-                        count += 1
-                        
-                        # Registrar resultado
-                        resultados.append({
-                            'Variável': var,
-                            'Teste': 'ANOVA',
-                            'Estatística': f_val,
-                            'P-valor': p_val,
-                            'Significativo': p_val < 0.05
-                        })
-            except Exception as e:
-                logger.error(f"Erro ao analisar variável categórica {var}: {str(e)}")
-    
-    logger.info(f"Analisadas {count} relações entre variáveis categóricas e {target_var}")
+    variaveis = [var for var in cat_vars if var in df.columns]
+    
+    # Uma variável por tarefa; cada processo recebe apenas as duas colunas que utiliza
+    with ProcessPoolExecutor(max_workers=max(1, min(len(variaveis), os.cpu_count() or 1))) as executor:
+        resultados = [
+            resultado for resultado in executor.map(
+                analisar_variavel_categorica,
+                [df[[var, target_var]] for var in variaveis],
+                variaveis,
+                [target_var] * len(variaveis),
+                [output_dir / f'boxplot_{var}_{target_var}.png' for var in variaveis]
+            )
+            if resultado is not None
+        ]
+    
+    logger.info(f"Analisadas {len(resultados)} relações entre variáveis categóricas e {target_var}")
     
     if resultados:
         return pd.DataFrame(resultados)
@@ -375,18 +796,48 @@ def executar_analise_correlacao(ano_referencia, target_var='TAXA_ABANDONO', nive
     
     resultados = {}
     
-    # 1. Calcular matriz de correlação
-    corr_matrix = calcular_matriz_correlacao(df, metodo=metodo, target_var=target_var)
+    # Variáveis numéricas extraídas uma única vez para correlações e p-values
+    X, colunas_num = extrair_variaveis_numericas(df)
+    
+    # Matrizes em cache, identificadas pelo conteúdo dos dados e pelo método
+    chave = chave_cache_correlacao(X, colunas_num)
+    cache_corr = CACHE_DIR / f"correlacao_{nivel}_{ano_referencia}_{metodo}_{chave}.parquet"
+    cache_p = CACHE_DIR / f"p_values_{nivel}_{ano_referencia}_{metodo}_{chave}.parquet"
+    
+    if target_var in colunas_num and cache_corr.exists() and cache_p.exists():
+        # Dados inalterados desde a última execução: reaproveitar matriz e p-values
+        corr_matrix = pd.read_parquet(cache_corr, engine='pyarrow')
+        p_values = pd.read_parquet(cache_p, engine='pyarrow')
+        logger.info(f"Matriz de correlação e p-values carregados do cache ({chave})")
+    else:
+        # 1. Calcular matriz de correlação
+        corr_matrix = calcular_matriz_correlacao(X, colunas_num, metodo=metodo, target_var=target_var)
+        
+        # 2. Calcular p-values
+        p_values = calcular_p_values(X, colunas_num, metodo=metodo, corr_matrix=corr_matrix)
+        
+        corr_matrix.to_parquet(cache_corr, engine='pyarrow')
+        p_values.to_parquet(cache_p, engine='pyarrow')
+        
+        # Manter apenas a entrada dos dados atuais para este nível, ano e método
+        removidos = limpar_cache_correlacao(nivel, ano_referencia, metodo, chave)
+        if removidos:
+            logger.info(f"{removidos} arquivos antigos removidos do cache")
+    
     resultados['matriz_correlacao'] = corr_matrix
+    resultados['p_values'] = p_values
     
     # Salvar matriz de correlação
-    corr_file = RESULTS_DIR / f"correlacao_{nivel}_{ano_referencia}.csv"
-    corr_matrix.to_csv(corr_file)
+    corr_file = salvar_tabela(
+        corr_matrix.astype(np.float32), RESULTS_DIR / f"correlacao_{nivel}_{ano_referencia}", index=True
+    )
     logger.info(f"Matriz de correlação salva em {corr_file}")
     
-    # 2. Calcular p-values
-    p_values = calcular_p_values(df, metodo=metodo)
-    resultados['p_values'] = p_values
+    # Salvar pares de variáveis (triângulo superior) com correlação e p-valor
+    pares_file = salvar_tabela(
+        correlacoes_em_pares(corr_matrix, p_values), RESULTS_DIR / f"correlacao_pares_{nivel}_{ano_referencia}"
+    )
+    logger.info(f"Correlações por par de variáveis salvas em {pares_file}")
     
     # 3. Visualizar mapa de correlação
     mapa_path = PLOTS_DIR / f"mapa_correlacao_{nivel}_{ano_referencia}.png"
@@ -401,7 +852,7 @@ def executar_analise_correlacao(ano_referencia, target_var='TAXA_ABANDONO', nive
     
     # 5. Gerar scatterplots para as principais correlações
     top_vars = correlacoes_target.head(5).index.tolist()
-    gerar_scatterplots(df, target_var, top_vars, PLOTS_DIR)
+    gerar_scatterplots(df, target_var, top_vars, PLOTS_DIR, correlacoes_target)
     
     # 6. Analisar variáveis categóricas
     cat_vars = df.select_dtypes(include=['object', 'category']).columns.tolist()
@@ -410,21 +861,16 @@ def executar_analise_correlacao(ano_referencia, target_var='TAXA_ABANDONO', nive
         resultados['analise_categorica'] = resultados_cat
     
     # 7. Gerar relatório de síntese
-    # Correlações significativas com a variável alvo
-    corr_target = corr_matrix[target_var].drop(target_var)
-    p_target = p_values[target_var].drop(target_var)
-    
-    relatorio = pd.DataFrame({
-        'Variável': corr_target.index,
-        'Correlação': corr_target.values,
-        'P-valor': p_target.values,
-        'Significativo': p_target < 0.05
-    })
+    # Correlações com a variável alvo, já ordenadas; p-values alinhados pela mesma ordem
+    corr_target = corr_matrix[target_var].drop(target_var).sort_values(ascending=False)
     
-    relatorio = relatorio.sort_values('Correlação', ascending=False)
+    relatorio = corr_target.rename('Correlação').rename_axis('Variável').reset_index()
+    relatorio['P-valor'] = p_values[target_var].reindex(corr_target.index).to_numpy()
+    relatorio['Significativo'] = relatorio['P-valor'].to_numpy() < 0.05
     
-    relatorio_file = RESULTS_DIR / f"relatorio_correlacao_{target_var}_{nivel}_{ano_referencia}.csv"
-    relatorio.to_csv(relatorio_file, index=False)
+    relatorio_file = salvar_tabela(
+        relatorio, RESULTS_DIR / f"relatorio_correlacao_{target_var}_{nivel}_{ano_referencia}"
+    )
     logger.info(f"Relatório de correlação salvo em {relatorio_file}")
     
     resultados['relatorio'] = relatorio
@@ -9,13 +9,19 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (habilita HalvingRandomSearchCV)
+from sklearn.model_selection import (
+    train_test_split, GridSearchCV, HalvingRandomSearchCV, StratifiedKFold, ParameterGrid
+)
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone
 from sklearn.impute import SimpleImputer
+from sklearn.feature_selection import VarianceThreshold
+from sklearn.inspection import permutation_importance
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     roc_auc_score, confusion_matrix, classification_report,
@@ -48,6 +54,9 @@ RESULTS_DIR = DATA_DIR / 'results'
 MODELS_DIR = RESULTS_DIR / 'models'
 PLOTS_DIR = BASE_DIR / 'visualizacoes' / 'graficos'
 
+# Limite de |correlação| acima do qual uma variável numérica é considerada redundante
+LIMIAR_CORRELACAO_REDUNDANTE = 0.98
+
 # Criar diretórios se não existirem
 for directory in [DATA_DIR, PROCESSED_DIR, RESULTS_DIR, MODELS_DIR, PLOTS_DIR]:
     if not directory.exists():
@@ -64,11 +73,17 @@ def carregar_dados_alunos(ano_referencia):
     Returns:
         pandas.DataFrame: DataFrame com dados de alunos
     """
-    arquivo = PROCESSED_DIR / f"dados_alunos_{ano_referencia}.csv"
+    arquivo = PROCESSED_DIR / f"dados_alunos_{ano_referencia}.parquet"
+    arquivo_csv = arquivo.with_suffix('.csv')
     
-    if arquivo.exists():
+    if arquivo.exists() or arquivo_csv.exists():
         try:
-            df = pd.read_csv(arquivo)
+            if arquivo.exists():
+                df = pd.read_parquet(arquivo, engine='pyarrow')
+            else:
+                # Arquivo legado em CSV
+                arquivo = arquivo_csv
+                df = pd.read_csv(arquivo)
             logger.info(f"Dados de {len(df)} alunos carregados com sucesso")
             return df
         except Exception as e:
@@ -79,57 +94,113 @@ def carregar_dados_alunos(ano_referencia):
         
         # Criar dados simulados para demonstração
         n_alunos = 10000
-        np.random.seed(42)
-        
-        # Simular variáveis independentes (features)
-        df_simulado = pd.DataFrame({
-            'ID_ALUNO': range(1, n_alunos + 1),
-            'SEXO': np.random.choice([0, 1], n_alunos),  # 0=Masculino, 1=Feminino
-            'IDADE': np.random.randint(14, 22, n_alunos),
-            'RACA_COR': np.random.choice([1, 2, 3, 4, 5], n_alunos),  # 1=Branca, 2=Preta, 3=Parda...
-            'RENDA_FAMILIAR': np.random.choice([1, 2, 3, 4, 5], n_alunos, p=[0.2, 0.3, 0.25, 0.15, 0.1]),  # Quintis
-            'ESCOLARIDADE_MAE': np.random.choice([1, 2, 3, 4, 5], n_alunos),  # 1=Sem escolaridade até 5=Superior
-            'TRABALHA': np.random.choice([0, 1], n_alunos, p=[0.7, 0.3]),
-            'HORAS_TRABALHO': np.random.choice([0, 10, 20, 30, 40], n_alunos, p=[0.7, 0.05, 0.1, 0.1, 0.05]),
-            'REPROVACOES': np.random.choice([0, 1, 2, 3, 4], n_alunos, p=[0.6, 0.2, 0.1, 0.07, 0.03]),
-            'DESEMPENHO_MEDIO': np.random.normal(6, 2, n_alunos).clip(0, 10),
-            'FREQUENCIA': np.random.beta(5, 2, n_alunos) * 100,
-            'DISTANCIA_ESCOLA_KM': np.random.exponential(5, n_alunos),
-            'ENGAJAMENTO': np.random.normal(5, 2, n_alunos).clip(0, 10),
-            'ATIVIDADES_EXTRACURRICULARES': np.random.choice([0, 1, 2, 3], n_alunos, p=[0.5, 0.3, 0.15, 0.05])
-        })
-        
-        # Adicionar variável de distorção idade-série
-        df_simulado['DISTORCAO_IDADE_SERIE'] = np.where(df_simulado['IDADE'] >= 18, 1, 0)
+        rng = np.random.default_rng(42)
+        
+        # Simular variáveis independentes (features) como arrays independentes
+        sexo = rng.choice([0, 1], n_alunos)  # 0=Masculino, 1=Feminino
+        idade = rng.integers(14, 22, n_alunos)
+        raca_cor = rng.choice([1, 2, 3, 4, 5], n_alunos)  # 1=Branca, 2=Preta, 3=Parda...
+        renda_familiar = rng.choice([1, 2, 3, 4, 5], n_alunos, p=[0.2, 0.3, 0.25, 0.15, 0.1])  # Quintis
+        escolaridade_mae = rng.choice([1, 2, 3, 4, 5], n_alunos)  # 1=Sem escolaridade até 5=Superior
+        trabalha = rng.choice([0, 1], n_alunos, p=[0.7, 0.3])
+        horas_trabalho = rng.choice([0, 10, 20, 30, 40], n_alunos, p=[0.7, 0.05, 0.1, 0.1, 0.05])
+        reprovacoes = rng.choice([0, 1, 2, 3, 4], n_alunos, p=[0.6, 0.2, 0.1, 0.07, 0.03])
+        desempenho_medio = rng.normal(6, 2, n_alunos).clip(0, 10)
+        frequencia = rng.beta(5, 2, n_alunos) * 100
+        distancia_escola_km = rng.exponential(5, n_alunos)
+        engajamento = rng.normal(5, 2, n_alunos).clip(0, 10)
+        atividades_extracurriculares = rng.choice([0, 1, 2, 3], n_alunos, p=[0.5, 0.3, 0.15, 0.05])
+        
+        # Distorção idade-série
+        distorcao_idade_serie = (idade >= 18).astype(np.int64)
         
         # Criar variável de abandono com base em fatores de risco
-        # Combinar múltiplos fatores com pesos diferentes
+        # Combinar múltiplos fatores com pesos diferentes (diretamente sobre os arrays)
         abandono_prob = (
             0.05 +  # Base rate
-            0.07 * df_simulado['TRABALHA'] +
-            0.03 * (df_simulado['HORAS_TRABALHO'] / 40) +
-            0.05 * df_simulado['REPROVACOES'] +
-            0.05 * df_simulado['DISTORCAO_IDADE_SERIE'] -
-            0.01 * (df_simulado['DESEMPENHO_MEDIO'] / 10) -
-            0.01 * (df_simulado['FREQUENCIA'] / 100) -
-            0.01 * (df_simulado['ENGAJAMENTO'] / 10) -
-            0.01 * df_simulado['ATIVIDADES_EXTRACURRICULARES'] +
-            0.03 * (df_simulado['DISTANCIA_ESCOLA_KM'] / 20) -
-            0.02 * (df_simulado['ESCOLARIDADE_MAE'] / 5) -
-            0.02 * (df_simulado['RENDA_FAMILIAR'] / 5) +
-            np.random.normal(0, 0.05, n_alunos)  # Ruído aleatório
+            0.07 * trabalha +
+            0.03 / 40 * horas_trabalho +
+            0.05 * reprovacoes +
+            0.05 * distorcao_idade_serie -
+            0.01 / 10 * desempenho_medio -
+            0.01 / 100 * frequencia -
+            0.01 / 10 * engajamento -
+            0.01 * atividades_extracurriculares +
+            0.03 / 20 * distancia_escola_km -
+            0.02 / 5 * escolaridade_mae -
+            0.02 / 5 * renda_familiar +
+            rng.normal(0, 0.05, n_alunos)  # Ruído aleatório
         ).clip(0, 1)
         
-        # Determinar abandono com base na probabilidade
-        df_simulado['ABANDONO'] = np.random.binomial(1, abandono_prob)
+        # Determinar abandono com base na probabilidade (sorteio de Bernoulli)
+        abandono = (rng.random(n_alunos) < abandono_prob).astype(np.int64)
+        
+        # Montar o DataFrame uma única vez
+        df_simulado = pd.DataFrame({
+            'ID_ALUNO': np.arange(1, n_alunos + 1),
+            'SEXO': sexo,
+            'IDADE': idade,
+            'RACA_COR': raca_cor,
+            'RENDA_FAMILIAR': renda_familiar,
+            'ESCOLARIDADE_MAE': escolaridade_mae,
+            'TRABALHA': trabalha,
+            'HORAS_TRABALHO': horas_trabalho,
+            'REPROVACOES': reprovacoes,
+            'DESEMPENHO_MEDIO': desempenho_medio,
+            'FREQUENCIA': frequencia,
+            'DISTANCIA_ESCOLA_KM': distancia_escola_km,
+            'ENGAJAMENTO': engajamento,
+            'ATIVIDADES_EXTRACURRICULARES': atividades_extracurriculares,
+            'DISTORCAO_IDADE_SERIE': distorcao_idade_serie,
+            'ABANDONO': abandono
+        }, copy=False)
+        
+        # Inteiros no menor tipo possível (arquivo e memória menores)
+        colunas_inteiras = df_simulado.select_dtypes(include='integer').columns
+        df_simulado[colunas_inteiras] = df_simulado[colunas_inteiras].apply(pd.to_numeric, downcast='integer')
         
         # Salvar dados simulados para uso futuro
-        df_simulado.to_csv(arquivo, index=False)
+        df_simulado.to_parquet(arquivo, engine='pyarrow', compression='zstd', index=False)
         logger.info(f"Criados dados simulados para {len(df_simulado)} alunos")
         
         return df_simulado
 
 
+def variaveis_redundantes(X_numerico, limiar=LIMIAR_CORRELACAO_REDUNDANTE):
+    """
+    Identifica variáveis numéricas quase perfeitamente correlacionadas com uma variável
+    numérica anterior que foi mantida
+    
+    Args:
+        X_numerico (pandas.DataFrame): Variáveis numéricas de treino
+        limiar (float): |correlação| acima da qual a variável é descartada
+        
+    Returns:
+        list: Nomes das variáveis redundantes
+    """
+    if X_numerico.shape[1] < 2:
+        return []
+    
+    # Correlação com pares completos (ignora ausentes); colunas constantes geram NaN e
+    # ficam a cargo do VarianceThreshold
+    corr = np.abs(X_numerico.corr().to_numpy())
+    
+    # Percorrer as colunas em ordem, comparando cada uma apenas com as já mantidas (uma
+    # coluna descartada não leva junto as que só se correlacionam com ela)
+    mantidas = []
+    redundantes = []
+    for j, coluna in enumerate(X_numerico.columns):
+        if np.any(corr[mantidas, j] > limiar):
+            redundantes.append(coluna)
+        else:
+            mantidas.append(j)
+    
+    if redundantes:
+        logger.info(f"Variáveis redundantes removidas: {', '.join(redundantes)}")
+    
+    return redundantes
+
+
 def preprocessar_dados(df, target_var='ABANDONO'):
     """
     Pré-processa os dados para modelagem
@@ -152,26 +223,35 @@ def preprocessar_dados(df, target_var='ABANDONO'):
     y = df[target_var]
     X = df.drop([target_var, 'ID_ALUNO'] if 'ID_ALUNO' in df.columns else target_var, axis=1)
     
+    # Reduzir colunas numéricas ao menor tipo que comporta os valores (int8/int16, float32)
+    colunas_inteiras = X.select_dtypes(include='integer').columns
+    X[colunas_inteiras] = X[colunas_inteiras].apply(pd.to_numeric, downcast='integer')
+    colunas_reais = X.select_dtypes(include='floating').columns
+    X[colunas_reais] = X[colunas_reais].apply(pd.to_numeric, downcast='float')
+    
     # Identificar tipos de colunas
-    numeric_features = X.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numeric_features = X.select_dtypes(include=[np.integer, np.floating]).columns.tolist()
     categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
     
-    # Preprocessador para pipeline
+    # Preprocessador para pipeline (saída esparsa: o one-hot nunca é densificado e o
+    # escalonamento sem centralização preserva a esparsidade)
     numeric_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='median')),
-        ('scaler', StandardScaler())
+        ('scaler', StandardScaler(with_mean=False, copy=False)),
+        ('selector', VarianceThreshold(threshold=1e-6))
     ])
     
     categorical_transformer = Pipeline(steps=[
         ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore'))
+        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True, dtype=np.float32))
     ])
     
     preprocessor = ColumnTransformer(
         transformers=[
             ('num', numeric_transformer, numeric_features),
             ('cat', categorical_transformer, categorical_features)
-        ]
+        ],
+        sparse_threshold=1.0
     )
     
     logger.info(f"Pré-processamento configurado para {len(numeric_features)} variáveis numéricas e {len(categorical_features)} categóricas")
@@ -179,6 +259,139 @@ def preprocessar_dados(df, target_var='ABANDONO'):
     return X, y, preprocessor
 
 
+class BuscaOOB:
+    """
+    Busca exaustiva de hiperparâmetros para RandomForest avaliada pelo erro out-of-bag
+    
+    Cada candidato é ajustado uma única vez no treino inteiro; as árvores são avaliadas nas
+    amostras que ficaram fora do seu bootstrap, o que dispensa a validação cruzada. Expõe a
+    mesma interface usada de GridSearchCV (fit, best_estimator_, best_params_, best_score_).
+    
+    Args:
+        estimator (RandomForestClassifier): Floresta base
+        param_grid (dict): Grade de hiperparâmetros
+    """
+    
+    def __init__(self, estimator, param_grid):
+        self.estimator = estimator
+        self.param_grid = param_grid
+    
+    def fit(self, X, y):
+        self.best_score_ = -np.inf
+        for parametros in ParameterGrid(self.param_grid):
+            floresta = clone(self.estimator).set_params(
+                oob_score=True, bootstrap=True, n_jobs=-1, **parametros
+            )
+            floresta.fit(X, y)
+            
+            # Amostras que nunca ficaram fora do bootstrap não têm previsão OOB
+            proba_oob = floresta.oob_decision_function_[:, 1]
+            validas = np.isfinite(proba_oob)
+            score = roc_auc_score(np.asarray(y)[validas], proba_oob[validas])
+            
+            if score > self.best_score_:
+                self.best_score_ = score
+                self.best_params_ = parametros
+                self.best_estimator_ = floresta
+        return self
+
+
+def ajustar_modelo(nome_modelo, busca, passos_preprocessamento, X_train_pp, y_train, X_test_pp,
+                   X_test, y_test, random_state=42):
+    """
+    Executa a busca de hiperparâmetros de um modelo e o avalia no conjunto de teste
+    
+    Args:
+        nome_modelo (str): Nome do modelo
+        busca (BaseSearchCV ou BuscaOOB): Busca de hiperparâmetros configurada com o classificador
+        passos_preprocessamento (list): Passos (nome, transformador já ajustado) que
+            produzem a matriz pré-processada a partir dos dados originais
+        X_train_pp (scipy.sparse matrix ou numpy.ndarray): Features de treino pré-processadas
+        y_train (pandas.Series): Alvo de treino
+        X_test_pp (scipy.sparse matrix ou numpy.ndarray): Features de teste pré-processadas
+        X_test (pandas.DataFrame): Features de teste originais
+        y_test (pandas.Series): Alvo de teste
+        random_state (int): Seed para a importância por permutação
+        
+    Returns:
+        tuple: (melhor modelo, melhores parâmetros, métricas, importância das features ou None,
+        probabilidades previstas no teste), ou None em caso de erro
+    """
+    logger.info(f"Treinando modelo: {nome_modelo}")
+    
+    try:
+        busca.fit(X_train_pp, y_train)
+        
+        # Melhor classificador
+        classificador = busca.best_estimator_
+        
+        # Fazer previsões
+        y_pred = classificador.predict(X_test_pp)
+        y_proba = classificador.predict_proba(X_test_pp)[:, 1]
+        
+        # Pipeline completo (preprocessador ajustado + classificador) para importância e persistência
+        melhor_modelo = Pipeline(passos_preprocessamento + [('classifier', classificador)])
+        
+        # Calcular métricas
+        metricas = {
+            'accuracy': accuracy_score(y_test, y_pred),
+            'precision': precision_score(y_test, y_pred),
+            'recall': recall_score(y_test, y_pred),
+            'f1': f1_score(y_test, y_pred),
+            'auc': roc_auc_score(y_test, y_proba),
+            'average_precision': average_precision_score(y_test, y_proba),
+            'confusion_matrix': confusion_matrix(y_test, y_pred).tolist()
+        }
+        
+        logger.info(f"Modelo {nome_modelo}: AUC = {metricas['auc']:.4f}, F1 = {metricas['f1']:.4f}")
+        
+        importancia = None
+        
+        # Extrair importância das features (se aplicável)
+        if hasattr(melhor_modelo[-1], 'feature_importances_'):
+            # Obter nomes das features após processamento
+            if hasattr(melhor_modelo[:-1], 'get_feature_names_out'):
+                feature_names = melhor_modelo[:-1].get_feature_names_out()
+            else:
+                feature_names = [f"feature_{i}" for i in range(melhor_modelo[-1].feature_importances_.shape[0])]
+            
+            # Calcular importância
+            importancia = pd.DataFrame({
+                'feature': feature_names,
+                'importance': melhor_modelo[-1].feature_importances_
+            }).sort_values('importance', ascending=False)
+        
+        # Para regressão logística, usar coeficientes como importância
+        elif hasattr(melhor_modelo[-1], 'coef_'):
+            if hasattr(melhor_modelo[:-1], 'get_feature_names_out'):
+                feature_names = melhor_modelo[:-1].get_feature_names_out()
+            else:
+                feature_names = [f"feature_{i}" for i in range(melhor_modelo[-1].coef_.shape[1])]
+            
+            importancia = pd.DataFrame({
+                'feature': feature_names,
+                'importance': np.abs(melhor_modelo[-1].coef_[0])
+            }).sort_values('importance', ascending=False)
+        
+        # Modelos sem importância nativa (ex.: HistGradientBoosting): importância por permutação
+        # das colunas originais no conjunto de teste
+        else:
+            permutacao = permutation_importance(
+                melhor_modelo, X_test, y_test,
+                scoring='roc_auc', n_repeats=5, random_state=random_state, n_jobs=-1
+            )
+            importancia = pd.DataFrame({
+                'feature': X_test.columns,
+                'importance': permutacao.importances_mean
+            }).sort_values('importance', ascending=False)
+        
+        return melhor_modelo, busca.best_params_, metricas, importancia, y_proba
+    
+    except Exception as e:
+        logger.error(f"Erro ao treinar modelo {nome_modelo}: {str(e)}")
+        return None
+
+
 def treinar_modelo(X, y, preprocessor, test_size=0.2, random_state=42):
     """
     Treina e avalia um modelo preditivo de abandono escolar
@@ -186,7 +399,7 @@ def treinar_modelo(X, y, preprocessor, test_size=0.2, random_state=42):
     Args:
         X (pandas.DataFrame): Features
         y (pandas.Series): Variável alvo
-        preprocessor (ColumnTransformer): Pré-processador de dados
+        preprocessor (ColumnTransformer): Pré-processador de dados (ajustado uma vez no treino)
         test_size (float): Proporção para conjunto de teste
         random_state (int): Seed para reprodutibilidade
         
@@ -202,41 +415,67 @@ def treinar_modelo(X, y, preprocessor, test_size=0.2, random_state=42):
     
     logger.info(f"Dados divididos: {len(X_train)} amostras de treino, {len(X_test)} amostras de teste")
     
+    # Descartar variáveis numéricas redundantes (as constantes saem no VarianceThreshold);
+    # a seleção fica na própria lista de colunas do ColumnTransformer, salvo com o modelo
+    transformadores = []
+    for nome, transformador, colunas in preprocessor.transformers:
+        if nome == 'num':
+            redundantes = variaveis_redundantes(X_train[colunas])
+            colunas = [coluna for coluna in colunas if coluna not in redundantes]
+        transformadores.append((nome, transformador, colunas))
+    preprocessor.set_params(transformers=transformadores)
+    
+    # Preprocessador ajustado uma única vez no treino e compartilhado por todos os modelos.
+    # Nos folds da validação cruzada ele não é reajustado: as estatísticas (mediana, moda,
+    # desvio padrão e categorias) vêm do treino inteiro, um vazamento pequeno aceito em troca
+    # de não repetir o pré-processamento em cada candidato e fold
+    X_train_pp = preprocessor.fit_transform(X_train, y_train)
+    X_test_pp = preprocessor.transform(X_test)
+    
     # Definir modelos a serem treinados
     modelos = {
-        'random_forest': Pipeline([
-            ('preprocessor', preprocessor),
-            ('classifier', RandomForestClassifier(random_state=random_state))
-        ]),
-        
-        'gradient_boosting': Pipeline([
-            ('preprocessor', preprocessor),
-            ('classifier', GradientBoostingClassifier(random_state=random_state))
-        ]),
-        
-        'logistic_regression': Pipeline([
-            ('preprocessor', preprocessor),
-            ('classifier', LogisticRegression(random_state=random_state, max_iter=1000))
-        ])
+        'random_forest': RandomForestClassifier(random_state=random_state),
+        # Boosting por histogramas (multithread)
+        'gradient_boosting': HistGradientBoostingClassifier(random_state=random_state),
+        'logistic_regression': LogisticRegression(random_state=random_state, max_iter=1000)
     }
     
-    # Parâmetros para otimização via grid search
+    # Matrizes e passos de pré-processamento de cada modelo. Apenas a regressão logística
+    # usa a saída esparsa: o boosting por histogramas não aceita entrada esparsa e a
+    # RandomForest é bem mais lenta em CSR com colunas numéricas densas. Os modelos de
+    # árvores usam uma cópia do preprocessador com saída densa (ajustada uma vez), que
+    # também é o passo salvo no seu pipeline
+    modelos_densos = {'random_forest', 'gradient_boosting'}
+    preprocessor_denso = clone(preprocessor).set_params(sparse_threshold=0)
+    matrizes_densas = (preprocessor_denso.fit_transform(X_train, y_train), preprocessor_denso.transform(X_test))
+    passos_esparsos = [('preprocessor', preprocessor)]
+    passos_densos = [('preprocessor', preprocessor_denso)]
+    
+    passos = {}
+    matrizes = {}
+    for nome_modelo in modelos:
+        denso = nome_modelo in modelos_densos
+        passos[nome_modelo] = passos_densos if denso else passos_esparsos
+        matrizes[nome_modelo] = matrizes_densas if denso else (X_train_pp, X_test_pp)
+    
+    # Parâmetros para otimização (grades discretas; no boosting, amostradas por successive
+    # halving, que descarta candidatos fracos ainda com poucas amostras)
     param_grids = {
         'random_forest': {
-            'classifier__n_estimators': [100, 200],
-            'classifier__max_depth': [None, 10, 20],
-            'classifier__min_samples_split': [2, 5]
+            'n_estimators': [100, 200],
+            'max_depth': [None, 10, 20],
+            'min_samples_split': [2, 5]
         },
         
         'gradient_boosting': {
-            'classifier__n_estimators': [100, 200],
-            'classifier__learning_rate': [0.01, 0.1],
-            'classifier__max_depth': [3, 5]
+            'max_iter': [100, 200],
+            'learning_rate': [0.01, 0.1],
+            'max_depth': [3, 5]
         },
         
         'logistic_regression': {
-            'classifier__C': [0.1, 1.0, 10.0],
-            'classifier__penalty': ['l2']
+            'C': [0.1, 1.0, 10.0],
+            'penalty': ['l2']
         }
     }
     
@@ -245,83 +484,67 @@ def treinar_modelo(X, y, preprocessor, test_size=0.2, random_state=42):
         'modelos': {},
         'metricas': {},
         'melhores_parametros': {},
-        'importancia_features': {}
+        'importancia_features': {},
+        'y_proba': {}
     }
     
-    # Treinar cada modelo com grid search
-    for nome_modelo, pipeline in modelos.items():
-        logger.info(f"Treinando modelo: {nome_modelo}")
-        
-        # Definir grid search
-        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=random_state)
-        grid_search = GridSearchCV(
-            pipeline,
-            param_grids[nome_modelo],
-            cv=cv,
-            scoring='roc_auc',
-            n_jobs=-1
+    # RandomForest: grade avaliada pelo erro out-of-bag (um ajuste por candidato, sem CV);
+    # boosting: successive halving; regressão logística (grade pequena e ajuste barato):
+    # grid search exaustivo
+    modelos_oob = {'random_forest'}
+    modelos_halving = {'gradient_boosting'}
+    logger.info("RandomForest avaliado por OOB em vez de validação cruzada; demais modelos usam CV estratificada")
+    
+    # Definir a busca de hiperparâmetros de cada modelo
+    cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=random_state)
+    buscas = {}
+    for nome_modelo, classificador in modelos.items():
+        if nome_modelo in modelos_oob:
+            buscas[nome_modelo] = BuscaOOB(classificador, param_grids[nome_modelo])
+        elif nome_modelo in modelos_halving:
+            buscas[nome_modelo] = HalvingRandomSearchCV(
+                classificador,
+                param_grids[nome_modelo],
+                resource='n_samples',
+                factor=3,
+                min_resources=500,
+                cv=cv,
+                scoring='roc_auc',
+                n_jobs=-1,
+                random_state=random_state
+            )
+        else:
+            buscas[nome_modelo] = GridSearchCV(
+                classificador,
+                param_grids[nome_modelo],
+                cv=cv,
+                scoring='roc_auc',
+                n_jobs=-1
+            )
+    
+    # Executar as buscas simultaneamente; backend de threads para que o n_jobs=-1 interno
+    # de cada busca não crie pools de processos aninhados
+    with joblib.parallel_backend('threading', n_jobs=len(buscas)):
+        ajustes = joblib.Parallel()(
+            joblib.delayed(ajustar_modelo)(
+                nome_modelo, busca, passos[nome_modelo],
+                matrizes[nome_modelo][0], y_train, matrizes[nome_modelo][1],
+                X_test, y_test, random_state
+            )
+            for nome_modelo, busca in buscas.items()
         )
+    
+    for nome_modelo, ajuste in zip(buscas, ajustes):
+        if ajuste is None:
+            continue
         
-        # Ajustar grid search
-        try:
-            grid_search.fit(X_train, y_train)
-            
-            # Melhor modelo
-            melhor_modelo = grid_search.best_estimator_
-            resultados['modelos'][nome_modelo] = melhor_modelo
-            resultados['melhores_parametros'][nome_modelo] = grid_search.best_params_
-            
-            # Fazer previsões
-            y_pred = melhor_modelo.predict(X_test)
-            y_proba = melhor_modelo.predict_proba(X_test)[:, 1]
-            
-            # Calcular métricas
-            metricas = {
-                'accuracy': accuracy_score(y_test, y_pred),
-                'precision': precision_score(y_test, y_pred),
-                'recall': recall_score(y_test, y_pred),
-                'f1': f1_score(y_test, y_pred),
-                'auc': roc_auc_score(y_test, y_proba),
-                'average_precision': average_precision_score(y_test, y_proba),
-                'confusion_matrix': confusion_matrix(y_test, y_pred).tolist()
-            }
-            
-            resultados['metricas'][nome_modelo] = metricas
-            
-            logger.info(f"Modelo {nome_modelo}: AUC = {metricas['auc']:.4f}, F1 = {metricas['f1']:.4f}")
-            
-            # Extrair importância das features (se aplicável)
-            if hasattr(melhor_modelo[-1], 'feature_importances_'):
-                # Obter nomes das features após processamento
-                if hasattr(melhor_modelo[0], 'get_feature_names_out'):
-                    feature_names = melhor_modelo[0].get_feature_names_out()
-                else:
-                    feature_names = [f"feature_{i}" for i in range(melhor_modelo[-1].feature_importances_.shape[0])]
-                
-                # Calcular importância
-                importancia = pd.DataFrame({
-                    'feature': feature_names,
-                    'importance': melhor_modelo[-1].feature_importances_
-                }).sort_values('importance', ascending=False)
-                
-                resultados['importancia_features'][nome_modelo] = importancia
-            
-            # Para regressão logística, usar coeficientes como importância
-            elif hasattr(melhor_modelo[-1], 'coef_'):
-                if hasattr(melhor_modelo[0], 'get_feature_names_out'):
-                    feature_names = melhor_modelo[0].get_feature_names_out()
-                else:
-                    feature_names = [f"feature_{i}" for i in range(melhor_modelo[-1].coef_.shape[1])]
-                
-                importancia = pd.DataFrame({
-                    'feature': feature_names,
-                    'importance': np.abs(melhor_modelo[-1].coef_[0])
-                }).sort_values('importance', ascending=False)
-                
-                resultados['importancia_features'][nome_modelo] = importancia
-        
-        except Exception as e:
-            logger.error(f"Erro ao treinar modelo {nome_modelo}: {str(e)}")
+        melhor_modelo, melhores_parametros, metricas, importancia, y_proba = ajuste
+        resultados['modelos'][nome_modelo] = melhor_modelo
+        resultados['melhores_parametros'][nome_modelo] = melhores_parametros
+        resultados['metricas'][nome_modelo] = metricas
+        resultados['y_proba'][nome_modelo] = y_proba
+        if importancia is not None:
+            resultados['importancia_features'][nome_modelo] = importancia
     
     # Adicionar dados de teste aos resultados para visualizações
     resultados['dados_teste'] = {
@@ -377,14 +600,13 @@ def visualizar_resultados(resultados, output_dir=PLOTS_DIR):
         # 2. Curvas ROC
         plt.figure(figsize=(12, 8))
         
+        # Probabilidades e AUC já calculadas no treinamento (sem nova passagem pelos modelos)
+        y_test = resultados['dados_teste']['y_test']
         for modelo_nome, modelo in resultados['modelos'].items():
             if modelo is not None:
-                y_test = resultados['dados_teste']['y_test']
-                X_test = resultados['dados_teste']['X_test']
-                
-                y_proba = modelo.predict_proba(X_test)[:, 1]
+                y_proba = resultados['y_proba'][modelo_nome]
                 fpr, tpr, _ = roc_curve(y_test, y_proba)
-                auc = roc_auc_score(y_test, y_proba)
+                auc = resultados['metricas'][modelo_nome]['auc']
                 
                 plt.plot(fpr, tpr, lw=2, label=f'{modelo_nome} (AUC = {auc:.3f})')
         
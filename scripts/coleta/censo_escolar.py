@@ -9,6 +9,9 @@ no ensino médio.
 import pandas as pd
 import numpy as np
 import os
+import posixpath
+import shutil
+import tempfile
 import zipfile
 import requests
 from datetime import datetime
@@ -99,30 +102,30 @@ def extrair_censo_escolar(ano, arquivo_zip):
         return None
     
     # Extrair arquivos para diretório temporário
-    temp_dir = os.path.join(RAW_DIR, f"temp_censo_{ano}")
-    os.makedirs(temp_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=f"temp_censo_{ano}_", dir=RAW_DIR)
     
     try:
         with zipfile.ZipFile(arquivo_zip, 'r') as zip_ref:
+            # Localizar os arquivos de matrícula e escola diretamente no índice do ZIP,
+            # comparando apenas o nome do arquivo (as pastas do pacote também contêm "ESCOLA")
+            nomes = [(n, posixpath.basename(n).upper()) for n in zip_ref.namelist()]
+            matricula_entry = next(
+                (n for n, base in nomes if 'MATRICULA' in base and base.endswith('.CSV')), None
+            )
+            escola_entry = next(
+                (n for n, base in nomes if 'ESCOLA' in base and base.endswith('.CSV')), None
+            )
+            
+            if not matricula_entry:
+                logger.error("Arquivo de matrícula não encontrado")
+                return None
+            
             # Extrair apenas arquivos relevantes (matricula e escola)
-            for file in zip_ref.namelist():
-                if ('MATRICULA' in file.upper() or 'ESCOLA' in file.upper()) and file.endswith('.CSV'):
-                    zip_ref.extract(file, temp_dir)
+            matricula_file = zip_ref.extract(matricula_entry, temp_dir)
+            escola_file = zip_ref.extract(escola_entry, temp_dir) if escola_entry else None
         
         logger.info("Arquivos do Censo Escolar extraídos com sucesso")
         
-        # Encontrar o arquivo de matrícula
-        matricula_file = None
-        for root, _, files in os.walk(temp_dir):
-            for file in files:
-                if 'MATRICULA' in file.upper() and file.endswith('.CSV'):
-                    matricula_file = os.path.join(root, file)
-                    break
-        
-        if not matricula_file:
-            logger.error("Arquivo de matrícula não encontrado")
-            return None
-        
         # Ler amostra para identificar o separador
         with open(matricula_file, 'r', encoding='latin-1') as f:
             primeira_linha = f.readline()
@@ -157,19 +160,11 @@ def extrair_censo_escolar(ano, arquivo_zip):
         )
         
         # Filtrar apenas ensino médio (códigos variam por ano)
-        codigos_ensino_medio = list(range(25, 38))  # Códigos típicos do ensino médio
-        df_ensino_medio = df_matricula[df_matricula['TP_ETAPA_ENSINO'].isin(codigos_ensino_medio)]
+        # Códigos típicos do ensino médio formam o intervalo contíguo 25-37
+        df_ensino_medio = df_matricula[df_matricula['TP_ETAPA_ENSINO'].between(25, 37)]
         
         logger.info(f"Processados {len(df_ensino_medio)} registros de matrícula do ensino médio")
         
-        # Encontrar o arquivo de escolas
-        escola_file = None
-        for root, _, files in os.walk(temp_dir):
-            for file in files:
-                if 'ESCOLA' in file.upper() and file.endswith('.CSV'):
-                    escola_file = os.path.join(root, file)
-                    break
-        
         if escola_file:
             logger.info("Carregando dados de escolas...")
             
@@ -241,16 +236,15 @@ def extrair_censo_escolar(ano, arquivo_zip):
         
         logger.info(f"Dados processados salvos em {output_file}")
         
-        # Limpeza: remover diretório temporário
-        for file in os.listdir(temp_dir):
-            os.remove(os.path.join(temp_dir, file))
-        os.rmdir(temp_dir)
-        
         return df_ensino_medio
     
     except Exception as e:
         logger.error(f"Erro ao extrair dados do Censo Escolar: {str(e)}")
         return None
+    
+    finally:
+        # Limpeza: remover diretório temporário (inclusive subdiretórios do ZIP)
+        shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 def processar_censo_escolar(ano):